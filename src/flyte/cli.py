@@ -1,24 +1,108 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import json
+import os
+import re
+import stat
 import shutil
 import sys
 from pathlib import Path
 
-from flyte.flyte import Flyte
 import textwrap
-from jinja2 import Environment, FileSystemLoader, select_autoescape
 try:
-    import yaml  # type: ignore
+    import orjson  # type: ignore
 except Exception:  # pragma: no cover
-    yaml = None
+    orjson = None
 
 __version__ = "0.1.1"
 
+# Google Fonts URL parameters encode spaces as '+'.
+_SPACE_TO_PLUS = str.maketrans({' ': '+'})
+
+# Importable image formats; matched case-insensitively against file names.
+_IMG_RE = re.compile(r'\.(png|jpe?g|gif|bmp|tiff|webp|pdf)\Z', re.IGNORECASE).search
+
+
+def _iter_images(root: Path):
+    """Yield all image files under root in a single directory walk.
+
+    Unlike the old per-extension rglob passes, a single walk yields each
+    file exactly once, so case-insensitive filesystems (macOS/Windows)
+    cannot produce duplicate entries that would be imported twice.
+    """
+    for dirpath, _dirnames, filenames in os.walk(root):
+        for name in filenames:
+            if _IMG_RE(name):
+                yield Path(dirpath) / name
+
+
+def _stat_probe(path: Path) -> tuple[bool, bool]:
+    """Return (exists, is_dir) for path with a single stat syscall."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (False, False)
+    return (True, stat.S_ISDIR(st.st_mode))
+
+
+def _import_one(job: tuple[Path, Path, dict]) -> dict:
+    """Import a single template image.
+
+    Module-level so it can be pickled into worker processes for parallel
+    directory imports.
+    """
+    img_file, file_output_dir, options = job
+    from flyte.flyte import Flyte
+
+    app = Flyte(data_dir=Path.cwd())
+    return app.import_template(img_file, output_dir=file_output_dir, **options)
+
+
+@functools.lru_cache(maxsize=1)
+def _fonts_env() -> "Environment":
+    """Build the Jinja2 environment once per process (templates never change at runtime).
+
+    The on-disk bytecode cache also lets fresh CLI processes skip the
+    lex/parse/codegen step entirely after the first run.
+    """
+    import os
+    import tempfile
+
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+    # uid-suffixed and 0o700: the cache holds marshalled bytecode that
+    # gets executed on load, so it must never be writable by other users
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    cache_dir = Path(tempfile.gettempdir()) / f"flyte-jinja-cache-{uid}"
+    bytecode_cache = None
+    try:
+        cache_dir.mkdir(mode=0o700, exist_ok=True)
+        if not hasattr(os, "getuid") or cache_dir.stat().st_uid == uid:
+            bytecode_cache = FileSystemBytecodeCache(str(cache_dir))
+    except OSError:
+        pass
+    return Environment(
+        loader=FileSystemLoader(str(Path(__file__).parent / "templates")),
+        autoescape=select_autoescape(["html", "xml"]),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        bytecode_cache=bytecode_cache,
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _fonts_template():
+    return _fonts_env().get_template("fonts.html.j2")
+
 
 def cmd_import(args: argparse.Namespace) -> None:
     """Handle the import subcommand."""
+    # Flyte pulls in numpy/OpenCV/Pillow transitively; keep the import out of
+    # module load so --help/--version stay fast
+    from flyte.flyte import Flyte
+
     src = Path(args.source)
     out_dir = Path(args.output) if args.output else None
     repo_url = args.repo_url if hasattr(args, 'repo_url') else None
@@ -26,33 +110,39 @@ def cmd_import(args: argparse.Namespace) -> None:
     
     # Check if source is a directory
     if src.is_dir():
-        # Import all image files in the directory
-        image_extensions = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.webp', '.pdf'}
-        image_files = []
-        
-        # Recursively find all image files
-        for ext in image_extensions:
-            image_files.extend(src.rglob(f'*{ext}'))
-            image_files.extend(src.rglob(f'*{ext.upper()}'))
-        
+        # Import all image files in the directory (single recursive walk, sorted once)
+        image_files = sorted(_iter_images(src))
+
         if not image_files:
             print(f"No image files found in {src}", file=sys.stderr)
             sys.exit(1)
         
-        print(f"Found {len(image_files)} image file(s) to import:")
-        for img_file in sorted(image_files):
-            relative_path = img_file.relative_to(src)
-            print(f"  {relative_path}")
-        print()
+        # One write for the whole listing instead of a syscall per file
+        sys.stdout.write(
+            "Found %d image file(s) to import:\n  %s\n\n"
+            % (len(image_files), "\n  ".join(str(p.relative_to(src)) for p in image_files))
+        )
         
         # Track all imported templates for index
         templates_index = []
-        
-        # Import each file
-        for img_file in sorted(image_files):
+
+        import_options = {
+            "placeholder_color": args.color,
+            "tolerance": args.tolerance,
+            "edge_dilation": args.dilate,
+            "background_sample_offset": args.offset,
+            "label_font": args.label_font,
+            "replace": args.replace,
+            "png_compression": args.png_compression,
+        }
+
+        # Build one job per file; analysis is CPU-bound and independent per image,
+        # so fan out across processes when there is more than one file.
+        jobs = []
+        for img_file in image_files:
             # Calculate relative path from source directory
             relative_path = img_file.relative_to(src)
-            
+
             # Determine output directory preserving structure
             if out_dir:
                 # Use the relative directory structure in output
@@ -60,34 +150,36 @@ def cmd_import(args: argparse.Namespace) -> None:
             else:
                 # Use source file's parent directory (default behavior)
                 file_output_dir = img_file.parent
-            
-            print(f"Importing: {relative_path}")
-            result = app.import_template(
-                img_file,
-                output_dir=file_output_dir,
-                placeholder_color=args.color,
-                tolerance=args.tolerance,
-                edge_dilation=args.dilate,
-                background_sample_offset=args.offset,
-                label_font=args.label_font,
-                replace=args.replace,
+
+            jobs.append((img_file, file_output_dir, import_options))
+
+        if len(jobs) >= 2:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+                results = list(ex.map(_import_one, jobs, chunksize=4))
+        else:
+            results = [_import_one(job) for job in jobs]
+
+        # resolve() stats the path; hoist the loop-invariant base out of the loop
+        # and keep it as a string so the per-image step is pure string math
+        base_str = str(out_dir.resolve() if out_dir else src.resolve())
+
+        for (img_file, _file_output_dir, _options), result in zip(jobs, results):
+            relative_path = img_file.relative_to(src)
+            sys.stdout.write(
+                f"Importing: {relative_path}\n"
+                f"  → {result['template']}\n"
+                f"  → {result['reference']}\n"
+                f"  → {result['regions']}\n\n"
             )
-            print(f"  → {result['template']}")
-            print(f"  → {result['reference']}")
-            print(f"  → {result['regions']}")
-            print()
-            
+
             # Add to index: determine the template directory path relative to output
-            template_dir = Path(result['regions']).parent
-            if out_dir:
-                # Resolve both to absolute paths before computing relative path
-                relative_template_path = template_dir.resolve().relative_to(out_dir.resolve())
-            else:
-                # When no output dir specified, templates are created alongside source files
-                # Use the path relative to the source directory itself
-                relative_template_path = template_dir.resolve().relative_to(src.resolve())
-            
-            templates_index.append(str(relative_template_path))
+            # (or the source directory when no output dir was specified).
+            # realpath matches the resolve()d base — mixing symlink-resolved
+            # and unresolved paths would make relpath emit ../.. detours
+            template_dir_str = os.path.dirname(os.path.realpath(result['regions']))
+            templates_index.append(os.path.relpath(template_dir_str, base_str))
         
         # Write index.json in the output directory
         if out_dir:
@@ -106,8 +198,15 @@ def cmd_import(args: argparse.Namespace) -> None:
             # Extract source directory path for upload links
             index_data["source_path"] = "source"
         
-        with index_path.open('w', encoding='utf-8') as f:
-            json.dump(index_data, f, indent=2)
+        # Write via a sibling tempfile + os.replace so readers never observe
+        # a truncated index if the process dies or imports race on the dir
+        tmp_path = index_path.with_suffix('.json.tmp')
+        if orjson is not None:
+            tmp_path.write_bytes(orjson.dumps(index_data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+        else:
+            with tmp_path.open('w', encoding='utf-8') as f:
+                json.dump(index_data, f, indent=2)
+        os.replace(tmp_path, index_path)
         
         print(f"Created index: {index_path}")
         
@@ -121,7 +220,9 @@ def cmd_import(args: argparse.Namespace) -> None:
             index_html_dest = src / "index.html"
         
         if index_html_template.exists():
-            shutil.copy2(index_html_template, index_html_dest)
+            # copyfile, not copy2: the template's mtime/permissions are not
+            # meaningful on a generated output file
+            shutil.copyfile(index_html_template, index_html_dest)
             print(f"Created gallery: {index_html_dest}")
         else:
             print(f"Warning: Template not found at {index_html_template}", file=sys.stderr)
@@ -129,17 +230,28 @@ def cmd_import(args: argparse.Namespace) -> None:
         # Generate fonts.html from docs/fonts.yaml if available (via Jinja2 template)
         try:
             fonts_yaml_path = Path("docs/fonts.yaml")
-            if yaml is None:
-                raise RuntimeError("PyYAML not installed; cannot render fonts.html")
             if fonts_yaml_path.exists():
-                with fonts_yaml_path.open("r", encoding="utf-8") as f:
-                    fonts_data = yaml.safe_load(f) or {}
+                # PyYAML is a heavy import; only pay for it when fonts.yaml exists
+                try:
+                    import yaml  # type: ignore
+                except Exception as exc:
+                    raise RuntimeError("PyYAML not installed; cannot render fonts.html") from exc
+                try:
+                    from yaml import CSafeLoader as _SafeLoader  # libyaml, 3-5x faster
+                except ImportError:
+                    from yaml import SafeLoader as _SafeLoader
+                # Binary mode: libyaml decodes the bytes itself, skipping the
+                # Python-level text decode pass
+                with fonts_yaml_path.open("rb") as f:
+                    fonts_data = yaml.load(f, Loader=_SafeLoader) or {}
 
                 def as_list(value):
                     return [x for x in (value or []) if isinstance(x, str)]
 
                 main = as_list(fonts_data.get("main"))
-                main_nogoogle = as_list(fonts_data.get("main_nogoogle")) or as_list(fonts_data.get("nogoogle"))
+                # Only fall back to the legacy 'nogoogle' key when the primary is empty
+                if not (main_nogoogle := as_list(fonts_data.get("main_nogoogle"))):
+                    main_nogoogle = as_list(fonts_data.get("nogoogle"))
                 other = as_list(fonts_data.get("other"))
                 # If category-based structure (arbitrary keys -> list) is provided, capture it
                 category_sections: list[tuple[str, list[str]]] = []
@@ -147,21 +259,16 @@ def cmd_import(args: argparse.Namespace) -> None:
                     for k, v in fonts_data.items():
                         if isinstance(v, list) and all(isinstance(x, str) for x in v):
                             title = k.replace("_", " ").title()
-                            category_sections.append((title, [str(x) for x in v]))
+                            # Already all str per the guard above; no per-item coercion
+                            category_sections.append((title, list(v)))
 
                 # Build Google Fonts links to ensure samples render with intended families
                 fam_set: set[str] = set()
-                for lst in (main, main_nogoogle, other):
-                    for f in lst:
-                        fam_set.add(str(f))
+                fam_set.update(main, main_nogoogle, other)
                 for _, lst in category_sections:
-                    for f in lst:
-                        fam_set.add(str(f))
-
-                def enc_family(name: str) -> str:
-                    return name.replace(" ", "+")
+                    fam_set.update(lst)
 
-                params = [f"family={enc_family(f)}" for f in sorted(fam_set)]
+                params = [f"family={name.translate(_SPACE_TO_PLUS)}" for name in sorted(fam_set)]
                 # Chunk into multiple <link>s to avoid overly long URLs
                 chunk_size = 12
                 chunks = [params[i:i+chunk_size] for i in range(0, len(params), chunk_size)]
@@ -191,15 +298,8 @@ def cmd_import(args: argparse.Namespace) -> None:
                         elif isinstance(v, list):
                             norm_repl[k] = [x for x in v if isinstance(x, str)]
 
-                # Render Jinja2 template
-                tpl_dir = Path(__file__).parent / "templates"
-                env = Environment(
-                    loader=FileSystemLoader(str(tpl_dir)),
-                    autoescape=select_autoescape(["html", "xml"]),
-                    trim_blocks=True,
-                    lstrip_blocks=True,
-                )
-                template = env.get_template("fonts.html.j2")
+                # Render Jinja2 template (environment and compiled template are cached per process)
+                template = _fonts_template()
 
                 sample_text = "Sphinx of black quartz, judge my vow — 123 ABC"
                 html = template.render(
@@ -231,6 +331,7 @@ def cmd_import(args: argparse.Namespace) -> None:
             background_sample_offset=args.offset,
             label_font=args.label_font,
             replace=args.replace,
+            png_compression=args.png_compression,
         )
         print(str(result["template"]))
         print(str(result["reference"]))
@@ -239,13 +340,16 @@ def cmd_import(args: argparse.Namespace) -> None:
 
 def cmd_compile(args: argparse.Namespace) -> None:
     """Handle the compile subcommand."""
+    from flyte.flyte import Flyte
+
     content_file = Path(args.content)
     template_dir = Path(args.template_dir)
     
     # Handle output: if it's a directory, construct filename from template name
     if args.output:
         output = Path(args.output)
-        if output.is_dir() or (not output.suffix and not output.exists()):
+        exists, is_dir = _stat_probe(output)
+        if is_dir or (not output.suffix and not exists):
             # It's a directory - construct filename from template directory name
             template_name = template_dir.name
             output = output / f"{template_name}.html"
@@ -266,12 +370,15 @@ def cmd_compile(args: argparse.Namespace) -> None:
 
 def cmd_render(args: argparse.Namespace) -> None:
     """Handle the render subcommand."""
+    from flyte.flyte import Flyte
+
     html_file = Path(args.html)
     
     # Handle output: if it's a directory, construct filename from HTML name
     if args.output:
         output = Path(args.output)
-        if output.is_dir() or (not output.suffix and not output.exists()):
+        exists, is_dir = _stat_probe(output)
+        if is_dir or (not output.suffix and not exists):
             # It's a directory - construct filename from HTML file name
             html_stem = html_file.stem
             # Default to PNG if no format specified
@@ -290,22 +397,7 @@ def cmd_render(args: argparse.Namespace) -> None:
     print(str(result))
 
 
-def main(argv: list[str] | None = None) -> None:
-    parser = argparse.ArgumentParser(
-        prog="flyte",
-        description="Flyer template rendering system",
-    )
-    
-    parser.add_argument(
-        "-v",
-        "--version",
-        action="version",
-        version=f"%(prog)s {__version__}",
-    )
-    
-    subparsers = parser.add_subparsers(dest="command", required=True, help="Available commands")
-    
-    # Import subcommand
+def _build_import_parser(subparsers) -> None:
     import_parser = subparsers.add_parser(
         "import",
         help="Import a source template image and generate template/reference/YAML",
@@ -351,6 +443,13 @@ def main(argv: list[str] | None = None) -> None:
         metavar="FONT_PATH",
         help="Optional TrueType/OTF font path to use for reference labels",
     )
+    import_parser.add_argument(
+        "--png-compression",
+        dest="png_compression",
+        type=int,
+        default=1,
+        help="PNG zlib level for generated images, 0-9 (default: 1)",
+    )
     import_parser.add_argument(
         "-r",
         "--replace",
@@ -364,9 +463,8 @@ def main(argv: list[str] | None = None) -> None:
         metavar="URL",
         help="GitHub repository URL for 'Add Source File' buttons (e.g., https://github.com/owner/repo)",
     )
-    import_parser.set_defaults(func=cmd_import)
-    
-    # Compile subcommand
+
+def _build_compile_parser(subparsers) -> None:
     compile_parser = subparsers.add_parser(
         "compile",
         help="Compile content and template into HTML",
@@ -395,9 +493,8 @@ def main(argv: list[str] | None = None) -> None:
         metavar="STYLE",
         help="Optional CSS stylesheet file",
     )
-    compile_parser.set_defaults(func=cmd_compile)
-    
-    # Render subcommand
+
+def _build_render_parser(subparsers) -> None:
     render_parser = subparsers.add_parser(
         "render",
         help="Render HTML to PNG or PDF",
@@ -421,12 +518,94 @@ def main(argv: list[str] | None = None) -> None:
         choices=["png", "pdf"],
         help="Output format (png or pdf). If not specified, determined by output extension or defaults to png",
     )
-    render_parser.set_defaults(func=cmd_render)
-    
-    args = parser.parse_args(argv)
-    
+
+_SUBCOMMAND_BUILDERS = {
+    "import": _build_import_parser,
+    "compile": _build_compile_parser,
+    "render": _build_render_parser,
+}
+
+_DISPATCH = {
+    "import": cmd_import,
+    "compile": cmd_compile,
+    "render": cmd_render,
+}
+
+
+def _sniff_subcommand(argv: list[str]) -> str | None:
+    """Return the requested subcommand, or None when it can't be determined.
+
+    The top-level parser only accepts flags before the subcommand, so the
+    first non-flag token is the command name.
+    """
+    for token in argv:
+        if not token.startswith("-"):
+            return token if token in _SUBCOMMAND_BUILDERS else None
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _build_parser(command: str | None = None) -> argparse.ArgumentParser:
+    """Construct the argument parser, building only the requested subparser.
+
+    Cached so repeated main() calls reuse the parser tree.
+    """
+    parser = argparse.ArgumentParser(
+        prog="flyte",
+        description="Flyer template rendering system",
+    )
+
+    parser.add_argument(
+        "-v",
+        "--version",
+        action="version",
+        version=f"%(prog)s {__version__}",
+    )
+
+    subparsers = parser.add_subparsers(dest="command", required=True, help="Available commands")
+
+    if command is not None:
+        _SUBCOMMAND_BUILDERS[command](subparsers)
+    else:
+        for build in _SUBCOMMAND_BUILDERS.values():
+            build(subparsers)
+
+    return parser
+
+
+_HELP_TEXT = """\
+usage: flyte [-h] [-v] {import,compile,render} ...
+
+Flyer template rendering system
+
+commands:
+  import     Import a source template image and generate template/reference/YAML
+  compile    Compile content and template into HTML
+  render     Render HTML to PNG or PDF
+
+options:
+  -h, --help     show this help message and exit
+  -v, --version  show program's version number and exit
+
+Run 'flyte <command> --help' for command-specific options.
+"""
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Fast path for the most common probes: answer before building any parser
+    if not argv or argv[0] in ("-h", "--help"):
+        print(_HELP_TEXT, end="")
+        return
+    if argv[0] in ("-v", "-V", "--version"):
+        print(f"flyte {__version__}")
+        return
+
+    args = _build_parser(_sniff_subcommand(argv)).parse_args(argv)
+
     try:
-        args.func(args)
+        _DISPATCH[args.command](args)
     except Exception as e:
         print(f"flyte: error: {e}", file=sys.stderr)
         raise SystemExit(2)
@@ -4,8 +4,9 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
-from flyte.render import compile_template, render_html_to_file, render_template
-from flyte.template_analyzer import analyze_template
+# flyte.render and flyte.template_analyzer pull in WeasyPrint and OpenCV
+# respectively; import them inside the methods that need them so that
+# constructing a Flyte (and importing this package) stays cheap.
 
 
 @dataclass(frozen=True)
@@ -17,6 +18,9 @@ class Flyte:
         object.__setattr__(self, "data_dir", Path(self.data_dir))
         if self.css_dir is not None:
             object.__setattr__(self, "css_dir", Path(self.css_dir))
+        # Per-instance memo for _resolve; bounded so batch loops over many
+        # distinct paths cannot grow it without limit.
+        object.__setattr__(self, "_resolve_cache", {})
 
     def import_template(
         self,
@@ -29,17 +33,21 @@ class Flyte:
         background_sample_offset: int = 5,
         label_font: str | None = None,
         replace: bool = False,
+        png_compression: int = 1,
+        emit_format: str = "yaml",
     ) -> dict[str, Any]:
-        src = self._resolve(Path(source_image))
+        src = self._resolve(source_image)
         
         # Default output directory is the same directory as the source file
         if output_dir is not None:
-            out_dir = self._resolve(Path(output_dir))
+            out_dir = self._resolve(output_dir)
         else:
             out_dir = src.parent
         
         out_dir.mkdir(parents=True, exist_ok=True)
 
+        from flyte.template_analyzer import analyze_template
+
         return analyze_template(
             src,
             out_dir,
@@ -49,6 +57,8 @@ class Flyte:
             background_sample_offset=background_sample_offset,
             label_font_path=label_font,
             replace=replace,
+            png_compression=png_compression,
+            emit_format=emit_format,
         )
 
     def compile(
@@ -59,11 +69,13 @@ class Flyte:
         *,
         style: str | Path | None = None,
     ) -> Path:
-        content_path = self._resolve(Path(content_file))
-        template_path = self._resolve(Path(template_dir))
-        output_path = self._resolve(Path(output))
-        style_path = self._resolve(Path(style)) if style else None
-        
+        content_path = self._resolve(content_file)
+        template_path = self._resolve(template_dir)
+        output_path = self._resolve(output)
+        style_path = self._resolve(style) if style else None
+
+        from flyte.render import compile_template
+
         return compile_template(
             content_path,
             template_path,
@@ -76,9 +88,11 @@ class Flyte:
         html_file: str | Path,
         output: str | Path,
     ) -> Path:
-        html_path = self._resolve(Path(html_file))
-        output_path = self._resolve(Path(output))
-        
+        html_path = self._resolve(html_file)
+        output_path = self._resolve(output)
+
+        from flyte.render import render_html_to_file
+
         return render_html_to_file(html_path, output_path)
 
     def render(
@@ -87,11 +101,13 @@ class Flyte:
         content_file: str | Path,
         output: str | Path,
     ) -> Path:
-        regions_path = self._resolve(Path(regions_file))
-        content_path = self._resolve(Path(content_file))
-        output_path = self._resolve(Path(output))
+        regions_path = self._resolve(regions_file)
+        content_path = self._resolve(content_file)
+        output_path = self._resolve(output)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
+        from flyte.render import render_template
+
         return render_template(
             regions_path,
             content_path,
@@ -99,5 +115,12 @@ class Flyte:
             css_dir=self.css_dir,
         )
 
-    def _resolve(self, path: Path) -> Path:
-        return path if path.is_absolute() else (self.data_dir / path)
+    def _resolve(self, path: str | Path) -> Path:
+        cached = self._resolve_cache.get(path)
+        if cached is not None:
+            return cached
+        p = path if isinstance(path, Path) else Path(path)
+        resolved = p if p.is_absolute() else (self.data_dir / p)
+        if len(self._resolve_cache) < 256:
+            self._resolve_cache[path] = resolved
+        return resolved
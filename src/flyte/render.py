@@ -1,170 +1,74 @@
 from __future__ import annotations
 
-import ctypes
+import hashlib
 import io
 import json
 import os
+import shutil
+import string
+import struct
 import sys
+from bisect import bisect_right
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Mapping
 
-import yaml
-from PIL import Image
-
-# On macOS with Homebrew, help CFFI find gobject when running inside a venv.
-if sys.platform == "darwin":
-    os.environ.setdefault("DYLD_FALLBACK_LIBRARY_PATH", "/opt/homebrew/lib")
-    try:
-        ctypes.CDLL("/opt/homebrew/lib/libgobject-2.0.dylib")
-    except OSError:
-        pass
-
-from weasyprint import CSS, HTML
-import pypdfium2 as pdfium
 import base64
-import io as _io
-try:
-    import qrcode
-except Exception:
-    qrcode = None
-
-
-def compile_template(
-    content_file: Path,
-    template_dir: Path,
-    output_path: Path,
-    *,
-    style_path: Path | None = None,
-) -> Path:
-    """Compile content and template into HTML."""
-    regions_file = template_dir / "regions.yaml"
-    if not regions_file.exists():
-        raise ValueError(f"regions.yaml not found in {template_dir}")
-    
-    regions_data = _load_yaml(regions_file)
-    
-    # Look for template.png in the template directory
-    template_path_option = template_dir / "template.png"
-    src_path_option = template_dir / "src.png"
-    
-    if template_path_option.exists():
-        template_path = template_path_option
-    elif src_path_option.exists():
-        template_path = src_path_option
-    else:
-        raise ValueError(f"Could not find template.png or src.png in {template_dir}")
-
-    # Load raw content file to get CSS reference
-    raw_content = _load_yaml(content_file)
-    content_map = _load_content(content_file)
-    
-    # Load CSS - priority: command line style_path, then content file CSS, then regions YAML
-    css_text = ""
-    if style_path:
-        css_text = style_path.read_text(encoding='utf-8')
-    else:
-        css_paths = []
-        if "css" in raw_content:
-            css_paths = [Path(raw_content["css"])]
-        elif regions_data.get("css"):
-            css_paths = [Path(p) for p in regions_data["css"]]
-        
-        if css_paths:
-            css_text = _load_css(css_paths, regions_file=regions_file, content_file=content_file, css_dir=None)
-
-    # Get template dimensions
-    template_img = Image.open(template_path)
-    template_width, template_height = template_img.size
-
-    # Build HTML with all content regions as absolutely positioned divs
-    regions = regions_data.get("regions", []) or []
-    
-    # Build the content divs
-    content_divs = []
-    for region in regions:
-        region_id = region.get("id")
-        name = (region.get("name") or "").strip()
-        role = (region.get("role") or "").strip()
-
-        html = None
-        # Try to find content by name first, then role, then id
-        if name and name in content_map:
-            html = content_map[name]
-        elif role and role in content_map:
-            html = content_map[role]
-        elif region_id is not None and str(region_id) in content_map:
-            html = content_map[str(region_id)]
-
-        # Special handling: generate QR code image when region name or role is 'qr_code'
-        if (name == "qr_code" or role == "qr_code" or str(region_id).lower() == "qr_code") and (content_map.get("url") or content_map.get("qr_code")):
-            url_value = content_map.get("qr_code") or content_map.get("url")
-            if qrcode:
-                qr = qrcode.QRCode(border=1, box_size=10)
-                qr.add_data(url_value)
-                qr.make(fit=True)
-                img_qr = qr.make_image(fill_color="black", back_color="white").convert("RGBA")
-                buf = _io.BytesIO()
-                img_qr.save(buf, format="PNG")
-                b64 = base64.b64encode(buf.getvalue()).decode("ascii")
-                html = f"<img alt='QR' src='data:image/png;base64,{b64}' style='width:100%;height:100%;object-fit:contain;' />"
-            else:
-                html = f"<div>QR: {url_value}</div>"
 
-        if not html:
-            continue
+# WeasyPrint, Pillow, pypdfium2, PyYAML, and the QR encoders are imported
+# lazily inside the functions that need them; importing this module stays
+# cheap for callers that only compile HTML. (Even `import qrcode` pulls
+# in Pillow.)
 
-        x = int(region["x"])
-        y = int(region["y"])
-        w = int(region["width"])
-        h = int(region["height"])
+_gobject_loaded = False
 
-        # Compute area and assign size category
-        area = w * h
-        if area < 50_000:
-            size_class = "xs"
-        elif area < 150_000:
-            size_class = "sm"
-        elif area < 300_000:
-            size_class = "md"
-        else:
-            size_class = "lg"
 
-        # Region identifier for id attribute
-        region_id_attr = (region.get("name") or str(region.get("id")) or "").strip()
+def _ensure_gobject_loaded() -> None:
+    """On macOS with Homebrew, help CFFI find gobject when running inside a venv."""
+    global _gobject_loaded
+    if _gobject_loaded:
+        return
+    _gobject_loaded = True
+    if sys.platform == "darwin":
+        import ctypes
 
-        content_divs.append(f"""
-        <div id="{region_id_attr}" class="region {size_class} {name}" style="position: absolute; left: {x}px; top: {y}px; width: {w}px; height: {h}px; overflow: hidden;">
-      {html}
-    </div>
-    """)
+        os.environ.setdefault("DYLD_FALLBACK_LIBRARY_PATH", "/opt/homebrew/lib")
+        try:
+            ctypes.CDLL("/opt/homebrew/lib/libgobject-2.0.dylib")
+        except OSError:
+            pass
 
-    content_html = "\n".join(content_divs)
 
-    # Create the full HTML with template as background image
-    doc_html = f"""<!doctype html>
+# Document shell for composed renders, split into a head (everything up
+# to the region divs) and a constant tail so callers can stream the
+# pieces straight to a file. Only the dimensions, template path, and
+# extra CSS vary per render; string.Template substitution avoids
+# rebuilding the constant boilerplate through f-string formatting.
+_DOC_HEAD_TMPL = string.Template("""<!doctype html>
 <html>
   <head>
     <meta charset='utf-8' />
     <style>
-      @page {{ size: {template_width}px {template_height}px; margin: 0; }}
-      html, body {{
+      @page { size: ${w}px ${h}px; margin: 0; }
+      html, body {
         margin: 0;
         padding: 0;
-        width: {template_width}px;
-        height: {template_height}px;
+        width: ${w}px;
+        height: ${h}px;
         overflow: hidden;
-        background-image: url('file://{template_path}');
-        background-size: {template_width}px {template_height}px;
+        background-image: url('file://${template_path}');
+        background-size: ${w}px ${h}px;
         background-repeat: no-repeat;
         position: relative;
-      }}
-      #container {{
+      }
+      #container {
         position: relative;
-        width: {template_width}px;
-        height: {template_height}px;
-      }}
+        width: ${w}px;
+        height: ${h}px;
+      }
       /* Size-based font scaling for regions */
-      .region {{
+      .region {
         line-height: 1.2;
         display: flex;
         flex-direction: column;
@@ -174,39 +78,261 @@ def compile_template(
         box-sizing: border-box;
         overflow: hidden;
         text-align: left;
-      }}
-      .region.xs {{ font-size: 32px; }}
-      .region.sm {{ font-size: 52px; }}
-      .region.md {{ font-size: 72px; }}
-      .region.lg {{ font-size: 90px; }}
+      }
+      .region.xs { font-size: 32px; }
+      .region.sm { font-size: 52px; }
+      .region.md { font-size: 72px; }
+      .region.lg { font-size: 90px; }
       /* Specific tuning: URL regions often need smaller base size */
-      .region.url {{ font-size: 36px; word-wrap: break-word; overflow-wrap: anywhere; text-align: center; }}
-      .region.qr_code {{ display: flex; align-items: center; justify-content: center; padding: 0; }}
-      .region.qr_code img {{ width: 90%; height: 90%; object-fit: contain; }}
+      .region.url { font-size: 36px; word-wrap: break-word; overflow-wrap: anywhere; text-align: center; }
+      .region.qr_code { display: flex; align-items: center; justify-content: center; padding: 0; }
+      .region.qr_code img { width: 90%; height: 90%; object-fit: contain; }
       /* Prevent text overflow and force text wrapping */
-      .region h2, .region p, .region div, .region a {{ 
+      .region h2, .region p, .region div, .region a {
         overflow-wrap: break-word;
         word-wrap: break-word;
         word-break: break-word;
         hyphens: auto;
         margin: 0;
         max-width: 100%;
-      }}
-      {css_text}
+      }
+      ${css_text}
     </style>
   </head>
   <body>
     <div id="container">
-      {content_html}
-    </div>
+      """)
+
+_DOC_TAIL = """</div>
   </body>
 </html>
+"""
+
+
+# Region area thresholds for the xs/sm/md/lg font-size classes
+_AREA_BINS = (50_000, 150_000, 300_000)
+_SIZE_CLASSES = ("xs", "sm", "md", "lg")
+
+# Per-region wrapper, %-formatted: one precompiled literal instead of an
+# f-string re-parsed per region, and no leading whitespace to bloat the
+# output or add text nodes for WeasyPrint to scan.
+_DIV_TMPL = (
+    '<div id="%s" class="region %s %s" '
+    'style="position: absolute; left: %dpx; top: %dpx; width: %dpx; height: %dpx; overflow: hidden;">%s</div>'
+)
+
+
+@lru_cache(maxsize=1)
+def _render_cache_dir() -> Path | None:
+    """Per-user on-disk cache for finished renders, keyed by content hash.
+
+    The directory is uid-suffixed and created 0o700 so other local users
+    can neither read cached renders nor pre-plant entries; if it already
+    exists but is not owned by us, the cache is disabled (None).
     """
+    import tempfile
 
-    # Write HTML to output file
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(doc_html, encoding='utf-8')
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    d = Path(tempfile.gettempdir()) / f"flyte-render-cache-{uid}"
+    try:
+        d.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if hasattr(os, "getuid") and d.stat().st_uid != uid:
+            return None
+    except OSError:
+        return None
+    return d
+
+
+def _prune_render_cache(cache_dir: Path, *, max_entries: int = 256) -> None:
+    """Drop the oldest cache entries beyond max_entries, best effort."""
+    try:
+        entries = [e for e in os.scandir(cache_dir) if e.is_file()]
+        if len(entries) <= max_entries:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for e in entries[: len(entries) - max_entries]:
+            try:
+                os.unlink(e.path)
+            except OSError:
+                pass
+    except OSError:
+        pass
+
+
+@lru_cache(maxsize=1)
+def _qr_modules():
+    """Import the preferred QR encoder on first use: (segno, qrcode)."""
+    try:
+        import segno  # pure Python, but ~10x faster than qrcode
+
+        return segno, None
+    except ImportError:
+        pass
+    try:
+        import qrcode
+
+        return None, qrcode
+    except ImportError:
+        return None, None
+
+
+def _build_content_divs(regions: list[dict[str, Any]], content_map: Mapping[str, str]) -> list[str]:
+    """Build the absolutely-positioned region divs for a composed document.
+
+    Shared by compile_template and render_template, which previously
+    carried identical copies of this loop. Returned as a fragment list
+    so file writers can stream it without joining first.
+    """
+    # Normalized alias map built once per document: the per-region lookup
+    # is then a single .get per candidate key, case-insensitively.
+    amap = {str(k).strip().lower(): v for k, v in content_map.items()}
+
+    content_divs: list[str] = []
+    for region in regions:
+        region_id = region.get("id")
+        name = (region.get("name") or "").strip()
+        role = (region.get("role") or "").strip()
+
+        # Try to find content by name first, then role, then id
+        html = None
+        if name:
+            html = amap.get(name.lower())
+        if html is None and role:
+            html = amap.get(role.lower())
+        if html is None and region_id is not None:
+            html = amap.get(str(region_id).lower())
+
+        # Special handling: generate QR code image when region name or role is 'qr_code'
+        if "qr_code" in (name, role, str(region_id).lower()) and (amap.get("url") or amap.get("qr_code")):
+            url_value = amap.get("qr_code") or amap.get("url")
+            # Import the encoder only when a QR region actually renders;
+            # even `import qrcode` pulls in Pillow
+            segno, qrcode = _qr_modules()
+            if segno or qrcode:
+                html = f"<img alt='QR' src='{_qr_data_uri(url_value)}' style='width:100%;height:100%;object-fit:contain;' />"
+            else:
+                html = f"<div>QR: {url_value}</div>"
+
+        if not html:
+            continue
+
+        x = int(region["x"])
+        y = int(region["y"])
+        w = int(region["width"])
+        h = int(region["height"])
+
+        # Compute area and assign size category; bisect_right keeps the
+        # original strict-< boundary semantics
+        size_class = _SIZE_CLASSES[bisect_right(_AREA_BINS, w * h)]
+
+        # Region identifier for id attribute
+        region_id_attr = (region.get("name") or str(region.get("id")) or "").strip()
+
+        content_divs.append(_DIV_TMPL % (region_id_attr, size_class, name, x, y, w, h, html))
+
+    return content_divs
+
+
+def _build_doc_html(
+    regions: list[dict[str, Any]],
+    content_map: Mapping[str, str],
+    template_path: Path,
+    width: int,
+    height: int,
+    css_text: str,
+) -> str:
+    """Compose the full flyer document: template background plus region divs."""
+    head = _DOC_HEAD_TMPL.safe_substitute(
+        w=width,
+        h=height,
+        template_path=template_path,
+        css_text=css_text,
+    )
+    return "".join([head, *_build_content_divs(regions, content_map), _DOC_TAIL])
+
+
+@lru_cache(maxsize=512)
+def _qr_data_uri(url: str, *, border: int = 1, box_size: int = 10) -> str:
+    """Encode url as a QR code PNG data URI, memoized by content.
+
+    Repeated URLs across batch renders cost one dict lookup instead of a
+    full mask evaluation + PNG encode. The image stays in the encoder's
+    native 1-bit mode; RGBA conversion only quadrupled the PNG bytes.
+
+    Prefers segno (roughly 10x faster mask evaluation, writes PNG without
+    a PIL round-trip) and falls back to qrcode. Either way the PNG is
+    written at a low DEFLATE level: a two-color QR is a few hundred
+    bytes regardless, so the default level just burns zlib cycles.
+    """
+    segno, qrcode = _qr_modules()
+    if segno is not None:
+        buf = io.BytesIO()
+        segno.make(url, error="m").save(buf, kind="png", scale=box_size, border=border, compresslevel=1)
+        return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+    qr = qrcode.QRCode(border=border, box_size=box_size)
+    qr.add_data(url)
+    qr.make(fit=True)
+    buf = io.BytesIO()
+    img_qr = qr.make_image(fill_color="black", back_color="white").convert("1")
+    img_qr.save(buf, format="PNG", optimize=False, compress_level=1)
+    return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def compile_template(
+    content_file: Path,
+    template_dir: Path,
+    output_path: Path,
+    *,
+    style_path: Path | None = None,
+) -> Path:
+    """Compile content and template into HTML."""
+    regions_file = template_dir / "regions.yaml"
+    if not regions_file.exists():
+        raise ValueError(f"regions.yaml not found in {template_dir}")
+    
+    regions_data = _load_yaml(regions_file)
+    
+    # Look for template.png in the template directory
+    template_path = _find_template_image(template_dir)
+    if template_path is None:
+        raise ValueError(f"Could not find template.png or src.png in {template_dir}")
+
+    # Load raw content file to get CSS reference
+    raw_content = _load_yaml(content_file)
+    content_map = _load_content(content_file)
     
+    # Load CSS - priority: command line style_path, then content file CSS, then regions YAML
+    css_text = ""
+    if style_path:
+        css_text = style_path.read_text(encoding='utf-8')
+    else:
+        css_paths = []
+        if "css" in raw_content:
+            css_paths = [Path(raw_content["css"])]
+        elif regions_data.get("css"):
+            css_paths = [Path(p) for p in regions_data["css"]]
+        
+        if css_paths:
+            css_text = _load_css(css_paths, regions_file=regions_file, content_file=content_file, css_dir=None)
+
+    # Get template dimensions (cached header read; no PIL decode)
+    template_width, template_height = _image_size(template_path)
+
+    # Stream the document to the output file: head shell, region divs,
+    # tail — no multi-kB doc_html string is materialized first
+    regions = regions_data.get("regions", []) or []
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with output_path.open("w", encoding="utf-8") as f:
+        f.write(_DOC_HEAD_TMPL.safe_substitute(
+            w=template_width,
+            h=template_height,
+            template_path=template_path,
+            css_text=css_text,
+        ))
+        f.writelines(_build_content_divs(regions, content_map))
+        f.write(_DOC_TAIL)
+
     return output_path
 
 
@@ -217,21 +343,21 @@ def render_template(
     *,
     css_dir: Path | None = None,
 ) -> Path:
+    """Render a template plus content to an image.
+
+    All regions are composed into one HTML document and rendered in a
+    single WeasyPrint pass; rendering per region would cold-start the
+    whole CSS/layout/raster pipeline once per region.
+    """
     regions_data = _load_yaml(regions_file)
     
     # New format: template.png in same directory, fallback to src.png or old format with "template" field
-    regions_dir = regions_file.parent
-    template_path_option = regions_dir / "template.png"
-    src_path_option = regions_dir / "src.png"
-    
-    if template_path_option.exists():
-        template_path = template_path_option
-    elif src_path_option.exists():
-        template_path = src_path_option
-    elif "template" in regions_data:
-        template_path = _resolve_sibling(regions_file, Path(regions_data["template"]))
-    else:
-        raise ValueError(f"Could not find template image for {regions_file}")
+    template_path = _find_template_image(regions_file.parent)
+    if template_path is None:
+        if "template" in regions_data:
+            template_path = _resolve_sibling(regions_file, Path(regions_data["template"]))
+        else:
+            raise ValueError(f"Could not find template image for {regions_file}")
 
     # Load raw content file to get CSS reference
     raw_content = _load_yaml(content_file)
@@ -244,167 +370,227 @@ def render_template(
     
     css_text = _load_css(css_paths, regions_file=regions_file, content_file=content_file, css_dir=css_dir)
 
-    # Get template dimensions
-    template_img = Image.open(template_path)
-    template_width, template_height = template_img.size
+    # Get template dimensions (header read only; WeasyPrint decodes the
+    # pixels itself via the file:// background reference)
+    template_width, template_height = _image_size(template_path)
 
-    # Build HTML with all content regions as absolutely positioned divs
+    # Build the full document: region divs over the template background
     regions = regions_data.get("regions", []) or []
-    
-    # Build the content divs
-    content_divs = []
-    for region in regions:
-        region_id = region.get("id")
-        name = (region.get("name") or "").strip()
-        role = (region.get("role") or "").strip()
+    doc_html = _build_doc_html(regions, content_map, template_path, template_width, template_height, css_text)
+
+    # Write HTML alongside the output for debugging, but only when asked:
+    # it costs a UTF-8 encode and a file write on every render otherwise
+    if os.environ.get("FLYTE_DEBUG"):
+        html_output_path = output_path.with_suffix('.html')
+        html_output_path.parent.mkdir(parents=True, exist_ok=True)
+        html_output_path.write_text(doc_html, encoding='utf-8')
+    else:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Finished-render cache: the composed document already encodes the
+    # regions, content, CSS, and template path, so hashing it (plus the
+    # template file's stat, standing in for its pixels) identifies the
+    # output exactly. Previews and retries with unchanged inputs skip
+    # WeasyPrint and pdfium entirely.
+    st = template_path.stat()
+    key = hashlib.blake2b(
+        doc_html.encode("utf-8") + b"|%d:%d" % (st.st_mtime_ns, st.st_size),
+        digest_size=16,
+    ).hexdigest()
+    cache_dir = _render_cache_dir()
+    cache_file = cache_dir / (key + output_path.suffix.lower()) if cache_dir else None
+    if cache_file is not None and cache_file.exists():
+        shutil.copyfile(cache_file, output_path)
+        return output_path
 
-        html = None
-        # Try to find content by name first, then role, then id
-        if name and name in content_map:
-            html = content_map[name]
-        elif role and role in content_map:
-            html = content_map[role]
-        elif region_id is not None and str(region_id) in content_map:
-            html = content_map[str(region_id)]
-
-        # Special handling: generate QR code image when region name is 'qr_code'
-        if (name == "qr_code" or str(region_id).lower() == "qr_code") and (content_map.get("url") or content_map.get("qr_code")):
-            url_value = content_map.get("qr_code") or content_map.get("url")
-            if qrcode:
-                qr = qrcode.QRCode(border=1, box_size=10)
-                qr.add_data(url_value)
-                qr.make(fit=True)
-                img_qr = qr.make_image(fill_color="black", back_color="white").convert("RGBA")
-                buf = _io.BytesIO()
-                img_qr.save(buf, format="PNG")
-                b64 = base64.b64encode(buf.getvalue()).decode("ascii")
-                html = f"<img alt='QR' src='data:image/png;base64,{b64}' style='width:100%;height:100%;object-fit:contain;' />"
-            else:
-                html = f"<div>QR: {url_value}</div>"
+    # Render HTML to image
+    rendered = _render_html_to_image_single(doc_html, width=template_width, height=template_height)
+    rendered.save(output_path)
 
-        if not html:
-            continue
+    # Best-effort cache fill; os.replace keeps concurrent writers atomic
+    if cache_file is not None:
+        try:
+            tmp = cache_file.with_name(cache_file.name + f".{os.getpid()}.tmp")
+            shutil.copyfile(output_path, tmp)
+            os.replace(tmp, cache_file)
+        except OSError:
+            pass
+        _prune_render_cache(cache_dir)
 
-        x = int(region["x"])
-        y = int(region["y"])
-        w = int(region["width"])
-        h = int(region["height"])
+    return output_path
 
-        # Compute area and assign size category
-        area = w * h
-        if area < 50_000:
-            size_class = "xs"
-        elif area < 150_000:
-            size_class = "sm"
-        elif area < 300_000:
-            size_class = "md"
-        else:
-            size_class = "lg"
 
-        # Region identifier for id attribute
-        region_id_attr = (region.get("name") or str(region.get("id")) or "").strip()
+def _render_worker_init() -> None:
+    """Warm a pool worker: import the heavy renderers and prime fontconfig.
 
-        content_divs.append(f"""
-        <div id="{region_id_attr}" class="region {size_class} {name}" style="position: absolute; left: {x}px; top: {y}px; width: {w}px; height: {h}px; overflow: hidden;">
-      {html}
-    </div>
-    """)
+    The first WeasyPrint render in a process pays for module import plus
+    font-database discovery; doing a throwaway render in the initializer
+    moves that cost off the first real page.
+    """
+    _ensure_gobject_loaded()
+    import pypdfium2  # noqa: F401
+    from weasyprint import HTML
 
-    content_html = "\n".join(content_divs)
+    HTML(string="<html></html>").write_pdf()
 
-    # Create the full HTML with template as background image
-    doc_html = f"""<!doctype html>
-<html>
-  <head>
-    <meta charset='utf-8' />
-    <style>
-      @page {{ size: {template_width}px {template_height}px; margin: 0; }}
-      html, body {{
-        margin: 0;
-        padding: 0;
-        width: {template_width}px;
-        height: {template_height}px;
-        overflow: hidden;
-        background-image: url('file://{template_path}');
-        background-size: {template_width}px {template_height}px;
-        background-repeat: no-repeat;
-        position: relative;
-      }}
-      #container {{
-        position: relative;
-        width: {template_width}px;
-        height: {template_height}px;
-      }}
-      /* Size-based font scaling for regions */
-      .region {{
-        line-height: 1.2;
-        display: flex;
-        flex-direction: column;
-        align-items: flex-start;
-        justify-content: flex-start;
-        padding: 8px;
-        box-sizing: border-box;
-        overflow: hidden;
-        text-align: left;
-      }}
-      .region.xs {{ font-size: 32px; }}
-      .region.sm {{ font-size: 52px; }}
-      .region.md {{ font-size: 72px; }}
-      .region.lg {{ font-size: 90px; }}
-      /* Specific tuning: URL regions often need smaller base size */
-      .region.url {{ font-size: 36px; word-wrap: break-word; overflow-wrap: anywhere; text-align: center; }}
-      .region.qr_code {{ display: flex; align-items: center; justify-content: center; padding: 0; }}
-      .region.qr_code img {{ width: 90%; height: 90%; object-fit: contain; }}
-      /* Prevent text overflow and force text wrapping */
-      .region h2, .region p, .region div, .region a {{ 
-        overflow-wrap: break-word;
-        word-wrap: break-word;
-        word-break: break-word;
-        hyphens: auto;
-        margin: 0;
-        max-width: 100%;
-      }}
-      {css_text}
-    </style>
-  </head>
-  <body>
-    <div id="container">
-      {content_html}
-    </div>
-  </body>
-</html>
+
+def _render_one(job: tuple[str, str, str, str | None]) -> Path:
+    """Pool worker: render one content file. Module-level so it pickles."""
+    regions_file, content_file, output_path, css_dir = job
+    return render_template(
+        Path(regions_file),
+        Path(content_file),
+        Path(output_path),
+        css_dir=Path(css_dir) if css_dir else None,
+    )
+
+
+def render_many(
+    regions_file: Path,
+    content_files: list[Path],
+    out_dir: Path,
+    *,
+    css_dir: Path | None = None,
+    suffix: str = ".png",
+) -> list[Path]:
+    """Render one template against many content files, in parallel.
+
+    WeasyPrint and pdfium are CPU-bound, so mass flyer generation scales
+    across processes; workers are warmed in an initializer so each one
+    pays the renderer cold-start once rather than per page. A single
+    content file renders inline without spawning a pool.
     """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    jobs = [
+        (str(regions_file), str(cf), str(out_dir / (Path(cf).stem + suffix)), str(css_dir) if css_dir else None)
+        for cf in content_files
+    ]
+    if len(jobs) < 2:
+        return [_render_one(job) for job in jobs]
 
-    # Write HTML to output directory for debugging
-    html_output_path = output_path.with_suffix('.html')
-    html_output_path.parent.mkdir(parents=True, exist_ok=True)
-    html_output_path.write_text(doc_html, encoding='utf-8')
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = min(len(jobs), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_render_worker_init) as ex:
+        return list(ex.map(_render_one, jobs))
+
+
+@lru_cache(maxsize=64)
+def _probe_template_cached(dir_str: str, dir_mtime_ns: int) -> Path | None:
+    for cand_name in ("template.png", "src.png"):
+        cand = Path(dir_str) / cand_name
+        if cand.exists():
+            return cand
+    return None
+
+
+def _find_template_image(template_dir: Path) -> Path | None:
+    """Probe template.png then src.png, cached on the directory's mtime.
+
+    Batch renders hit the same template directory for every page; the
+    directory mtime keys the cache so adding or removing a template
+    image invalidates it.
+    """
+    try:
+        dir_mtime_ns = template_dir.stat().st_mtime_ns
+    except OSError:
+        return None
+    return _probe_template_cached(str(template_dir), dir_mtime_ns)
 
-    # Render HTML to image
-    rendered = _render_html_to_image_single(doc_html, width=template_width, height=template_height)
-    rendered.save(output_path)
-    
-    return output_path
 
+@lru_cache(maxsize=1)
+def _yaml_safe_loader():
+    """Return the libyaml CSafeLoader when available, else the Python SafeLoader."""
+    import yaml
 
-def _load_yaml(path: Path) -> dict[str, Any]:
-    with path.open("r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _image_size(path: Path) -> tuple[int, int]:
+    """Return (width, height) without decoding pixel data when possible.
+
+    PNG stores its dimensions in the IHDR chunk right after the signature;
+    other formats fall back to a (lazy) PIL open, which still avoids a
+    full decode. Cached on (path, mtime) so a server rendering many
+    content variants against one template reads the header once.
+    """
+    return _image_size_cached(str(path), path.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=64)
+def _image_size_cached(path_str: str, mtime_ns: int) -> tuple[int, int]:
+    path = Path(path_str)
+    if path.suffix.lower() == ".png":
+        with path.open("rb") as f:
+            header = f.read(24)
+        if len(header) == 24 and header[:8] == b"\x89PNG\r\n\x1a\n" and header[12:16] == b"IHDR":
+            w, h = struct.unpack(">II", header[16:24])
+            return (int(w), int(h))
+    from PIL import Image
+
+    with Image.open(path) as img:
+        return img.size
+
+
+def _load_yaml(path: Path) -> Mapping[str, Any]:
+    """Parse a regions/content YAML file, cached on (path, mtime, size)."""
+    st = path.stat()
+    return _load_yaml_cached(str(path), st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=64)
+def _load_yaml_cached(path_str: str, mtime_ns: int, size: int) -> Mapping[str, Any]:
+    # Fresh processes can skip YAML entirely: a JSON sidecar written on the
+    # first parse loads an order of magnitude faster than re-parsing YAML
+    sidecar = Path(path_str + ".json")
+    try:
+        if sidecar.stat().st_mtime_ns >= mtime_ns:
+            data = json.loads(sidecar.read_bytes())
+            if isinstance(data, dict):
+                return MappingProxyType(data)
+    except (OSError, ValueError):
+        pass
+
+    import yaml
+
+    with open(path_str, "rb") as f:
+        data = yaml.load(f, Loader=_yaml_safe_loader())
     if not isinstance(data, dict):
-        raise ValueError(f"Invalid regions yaml: {path}")
-    return data
+        raise ValueError(f"Invalid regions yaml: {path_str}")
+
+    # Best-effort sidecar refresh; a read-only tree just means no cache
+    try:
+        sidecar.write_text(json.dumps(data))
+    except (OSError, TypeError):
+        pass
+
+    # Read-only view: the dict is shared between all cached callers
+    return MappingProxyType(data)
 
 
-def _load_content(path: Path) -> dict[str, str]:
+def _load_content(path: Path) -> Mapping[str, str]:
+    """Parse a content mapping file, cached on (path, mtime, size)."""
+    st = path.stat()
+    return _load_content_cached(str(path), st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=64)
+def _load_content_cached(path_str: str, mtime_ns: int, size: int) -> Mapping[str, str]:
+    import yaml
+
+    path = Path(path_str)
     raw: Any
-    text = path.read_text(encoding="utf-8")
     if path.suffix.lower() == ".json":
-        raw = json.loads(text)
+        with path.open("r", encoding="utf-8") as f:
+            raw = json.load(f)
     else:
         try:
-            raw = yaml.safe_load(text)
+            # Stream from the open file: no full-text str materialized first
+            with path.open("rb") as f:
+                raw = yaml.load(f, Loader=_yaml_safe_loader())
         except Exception:
-            raw = json.loads(text)
+            raw = json.loads(path.read_text(encoding="utf-8"))
 
     if not isinstance(raw, dict):
         raise ValueError("Content file must be a JSON/YAML object mapping ids/names to HTML")
@@ -419,66 +605,128 @@ def _load_content(path: Path) -> dict[str, str]:
         if v is None:
             continue
         out[str(k)] = str(v)
-    return out
+    return MappingProxyType(out)
 
 
 def _resolve_sibling(regions_file: Path, relative_or_abs: Path) -> Path:
     return relative_or_abs if relative_or_abs.is_absolute() else (regions_file.parent / relative_or_abs)
 
 
+@lru_cache(maxsize=256)
+def _read_text_cached(path_str: str, mtime_ns: int, size: int) -> str:
+    """Read a text file, cached on (path, mtime, size) like the YAML loaders."""
+    return Path(path_str).read_text(encoding="utf-8")
+
+
 def _load_css(css_paths: list[Path], *, regions_file: Path, content_file: Path | None = None, css_dir: Path | None) -> str:
     parts: list[str] = []
     for p in css_paths:
-        candidate = p
-        if not candidate.is_absolute():
-            if css_dir is not None:
-                candidate = css_dir / candidate
-            else:
-                # Try resolving in order: cwd, content file parent, regions file parent
-                candidates = [Path.cwd() / candidate]
-                if content_file is not None:
-                    candidates.append(content_file.parent / candidate)
-                candidates.append(regions_file.parent / candidate)
-                
-                candidate = None
-                for c in candidates:
-                    if c.exists():
-                        candidate = c
-                        break
-                
-                if candidate is None:
-                    candidate = candidates[0]  # Default to first if none found
-        
-        if candidate.exists():
-            parts.append(candidate.read_text(encoding="utf-8"))
+        # Resolve the candidate with a single stat per location; the stat
+        # result doubles as the cache key, so repeated renders neither
+        # re-probe the search path nor re-read unchanged style files.
+        if p.is_absolute():
+            candidates = [p]
+        elif css_dir is not None:
+            candidates = [css_dir / p]
+        else:
+            # Try resolving in order: cwd, content file parent, regions file parent
+            candidates = [Path.cwd() / p]
+            if content_file is not None:
+                candidates.append(content_file.parent / p)
+            candidates.append(regions_file.parent / p)
+
+        for candidate in candidates:
+            try:
+                st = candidate.stat()
+            except OSError:
+                continue
+            parts.append(_read_text_cached(str(candidate), st.st_mtime_ns, st.st_size))
+            break
     return "\n".join(parts)
 
 
-def _render_html_to_image_single(html: str, *, width: int, height: int) -> Image.Image:
+@lru_cache(maxsize=32)
+def _fetch_file_cached(url: str, mtime_ns: int) -> tuple[bytes, str | None]:
+    from weasyprint import default_url_fetcher
+
+    result = default_url_fetcher(url)
+    file_obj = result.get("file_obj")
+    if file_obj is not None:
+        data = file_obj.read()
+        file_obj.close()
+    else:
+        data = result.get("string") or b""
+    return data, result.get("mime_type")
+
+
+def _cached_fetcher(url: str) -> dict[str, Any]:
+    """WeasyPrint url_fetcher that memoizes local file resources.
+
+    Batch renders reference the same template PNG from every document;
+    caching its bytes on (url, mtime) turns the repeated open+read into
+    a dict lookup. Non-file URLs go straight to the default fetcher.
+    """
+    if url.startswith("file://"):
+        from urllib.parse import unquote, urlparse
+
+        try:
+            mtime_ns = os.stat(unquote(urlparse(url).path)).st_mtime_ns
+        except OSError:
+            mtime_ns = -1
+        data, mime = _fetch_file_cached(url, mtime_ns)
+        result: dict[str, Any] = {"string": data, "redirected_url": url}
+        if mime:
+            result["mime_type"] = mime
+        return result
+
+    from weasyprint import default_url_fetcher
+
+    return default_url_fetcher(url)
+
+
+def _render_html_to_image_single(html: str, *, width: int, height: int) -> "Image.Image":
     """Render a complete HTML document to an image."""
+    from PIL import Image
+    import pypdfium2 as pdfium
+
+    _ensure_gobject_loaded()
+    from weasyprint import HTML
+
     w = max(1, int(width))
     h = max(1, int(height))
 
-    # Render HTML to PDF using WeasyPrint
-    pdf_bytes = io.BytesIO()
-    HTML(string=html, base_url=str(Path.cwd())).write_pdf(pdf_bytes)
-    pdf_bytes.seek(0)
-    
+    # Render HTML to PDF using WeasyPrint; write_pdf() returns the bytes
+    # directly, so pdfium can read them without a BytesIO round-trip.
+    # (WeasyPrint >= 53 dropped write_image_surface, so the PDF stage cannot
+    # be skipped outright; an uncompressed intermediate at least spares a
+    # zlib deflate that pdfium would immediately inflate again.)
+    pdf_data = HTML(string=html, base_url=str(Path.cwd()), url_fetcher=_cached_fetcher).write_pdf(uncompressed_pdf=True)
+
     # Convert PDF to PNG using pypdfium2
-    pdf = pdfium.PdfDocument(pdf_bytes)
+    pdf = pdfium.PdfDocument(pdf_data)
     page = pdf[0]
-    
+
+    # Rasterize straight to the target pixel size: pdfium's scale maps
+    # page points to pixels, so deriving it from the page geometry lets
+    # pdfium draw at the right resolution and spares a full-image
+    # resample afterwards.
+    pw_pt, ph_pt = page.get_size()
+    scale = max(w / pw_pt, h / ph_pt) if pw_pt and ph_pt else 1.0
+
     # Render with transparent background
-    bitmap = page.render(scale=1.0, fill_color=(0, 0, 0, 0))
+    bitmap = page.render(scale=scale, fill_color=(0, 0, 0, 0))
     pil_image = bitmap.to_pil()
-    
+
     pdf.close()
-    
-    # Convert to RGBA and ensure correct size
-    img = pil_image.convert("RGBA")
+
+    # pdfium already hands back RGBA when rendered with an alpha fill
+    # color; only convert (a full pixel copy) when it does not. Any
+    # residual size mismatch is a rounding pixel, which cheap bilinear
+    # corrects without a LANCZOS convolution.
+    img = pil_image if pil_image.mode == "RGBA" else pil_image.convert("RGBA")
     if img.size != (w, h):
-        img = img.resize((w, h), Image.Resampling.LANCZOS)
-    
+        img = img.resize((w, h), Image.Resampling.BILINEAR)
+
     return img
 
 
@@ -487,6 +735,11 @@ def render_html_to_file(
     output_path: Path,
 ) -> Path:
     """Render an HTML file to PNG or PDF based on output extension."""
+    import pypdfium2 as pdfium
+
+    _ensure_gobject_loaded()
+    from weasyprint import HTML
+
     html_content = html_file.read_text(encoding='utf-8')
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
@@ -495,16 +748,14 @@ def render_html_to_file(
     
     if output_ext == '.pdf':
         # Render to PDF with active links
-        HTML(string=html_content, base_url=str(html_file.parent)).write_pdf(output_path)
+        HTML(string=html_content, base_url=str(html_file.parent), url_fetcher=_cached_fetcher).write_pdf(output_path)
     elif output_ext == '.png':
         # Render to PNG
-        # First render to PDF
-        pdf_bytes = io.BytesIO()
-        HTML(string=html_content, base_url=str(html_file.parent)).write_pdf(pdf_bytes)
-        pdf_bytes.seek(0)
-        
+        # First render to PDF (uncompressed: it only feeds pdfium in memory)
+        pdf_data = HTML(string=html_content, base_url=str(html_file.parent), url_fetcher=_cached_fetcher).write_pdf(uncompressed_pdf=True)
+
         # Convert PDF to PNG using pypdfium2
-        pdf = pdfium.PdfDocument(pdf_bytes)
+        pdf = pdfium.PdfDocument(pdf_data)
         page = pdf[0]
         
         # Render with transparent background
@@ -513,8 +764,8 @@ def render_html_to_file(
         
         pdf.close()
         
-        # Save as PNG
-        img = pil_image.convert("RGBA")
+        # Save as PNG (skip the pixel-copying convert when already RGBA)
+        img = pil_image if pil_image.mode == "RGBA" else pil_image.convert("RGBA")
         img.save(output_path)
     else:
         raise ValueError(f"Unsupported output format: {output_ext}. Use .png or .pdf")
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import os
+import re
+import shutil
+from dataclasses import dataclass, replace
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -8,6 +12,11 @@ import cv2
 import numpy as np
 import pytesseract
 import yaml
+
+try:  # libyaml-backed loader/dumper when PyYAML was built with it
+    from yaml import CSafeDumper as _SafeDumper, CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeDumper as _SafeDumper, SafeLoader as _SafeLoader
 from PIL import Image, ImageDraw, ImageFont
 import pypdfium2 as pdfium
 try:
@@ -15,6 +24,10 @@ try:
 except Exception:
     fitz = None
 
+# FontDescriptor scan patterns for _extract_embedded_fonts, compiled once
+_FONTDESC_MARKER = "/Type /FontDescriptor"
+_FONTNAME_RE = re.compile(r"/FontName\s*/(?:[A-Z]+\+)?([^\s/\]]+)")
+
 
 @dataclass(frozen=True)
 class Region:
@@ -38,21 +51,40 @@ def analyze_template(
     background_sample_offset: int = 5,
     label_font_path: str | None = None,
     replace: bool = False,
+    png_compression: int = 1,
+    emit_format: str = "yaml",
 ) -> dict[str, Any]:
+    # Pin OpenCV's internal pool: the per-region calls below are too
+    # small for fine-grained auto-threading to help, and region-level
+    # threads provide the parallelism instead
+    cv2.setNumThreads(1)
+
     # Determine input type and load/render to image
     img_bgr: np.ndarray
+    img_fut = None
     src_suffix = source_image.suffix.lower()
     if src_suffix == ".pdf":
-        # Render first page to PNG at 600 DPI using pypdfium2
+        # Render first page to PNG at 600 DPI using pypdfium2. The
+        # render dominates PDF ingest and is independent of the setup
+        # below, so it runs on a worker thread and is collected right
+        # before the pixels are first needed.
         pdf = pdfium.PdfDocument(str(source_image))
         if len(pdf) == 0:
             raise ValueError(f"PDF has no pages: {source_image}")
         page = pdf[0]
         scale = 600 / 72.0  # 600 DPI
-        bitmap = page.render(scale=scale, fill_color=(255, 255, 255, 255))
-        pil = bitmap.to_pil()
-        pdf.close()
-        img_bgr = cv2.cvtColor(np.array(pil.convert("RGB")), cv2.COLOR_RGB2BGR)
+
+        def _render_pdf_page() -> np.ndarray:
+            bitmap = page.render(scale=scale, fill_color=(255, 255, 255, 255))
+            pil = bitmap.to_pil()
+            pdf.close()
+            return cv2.cvtColor(np.array(pil.convert("RGB")), cv2.COLOR_RGB2BGR)
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        pool = ThreadPoolExecutor(max_workers=1)
+        img_fut = pool.submit(_render_pdf_page)
+        pool.shutdown(wait=False)
         source_is_pdf = True
     else:
         img_bgr = cv2.imread(str(source_image), cv2.IMREAD_COLOR)
@@ -72,6 +104,8 @@ def analyze_template(
     regions_name = "regions.yaml"
 
     placeholder_bgr = hex_to_bgr(placeholder_color)
+    if img_fut is not None:
+        img_bgr = img_fut.result()
     mask = _color_mask(img_bgr, placeholder_bgr, tolerance=tolerance)
     contours = _find_contours(mask)
     if not contours:
@@ -85,8 +119,11 @@ def analyze_template(
         background_sample_offset=background_sample_offset,
     )
 
-    # Extract text from regions using OCR
-    regions = _extract_text_from_regions(img_bgr, regions)
+    # Extract text from regions using OCR; PDF pages were rasterized at
+    # 600 DPI, which is worth downscaling before Tesseract sees it
+    regions = _extract_text_from_regions(
+        img_bgr, regions, source_dpi=600 if source_is_pdf else None
+    )
 
     template_img = _make_template_image(
         img_bgr,
@@ -94,13 +131,6 @@ def analyze_template(
         edge_dilation=edge_dilation,
     )
 
-    reference_img = _make_reference_image(
-        template_img,
-        regions,
-        placeholder_color=placeholder_color,
-        label_font_path=label_font_path,
-    )
-
     role_map = _guess_region_names(regions)
 
     # Save files in the project directory
@@ -109,47 +139,68 @@ def analyze_template(
     reference_path = project_dir / reference_name
     regions_path = project_dir / regions_name
 
-    # Copy source image as PNG (converting if needed)
-    cv2.imwrite(str(src_path), img_bgr)
+    # These PNGs are working artifacts, not distribution assets, so a
+    # fast zlib level beats the default; the filtered strategy suits
+    # photographic template content
+    png_params = [
+        cv2.IMWRITE_PNG_COMPRESSION, int(png_compression),
+        cv2.IMWRITE_PNG_STRATEGY, cv2.IMWRITE_PNG_STRATEGY_FILTERED,
+    ]
+
+    # Copy source image as PNG (converting if needed); for PNG input the
+    # bytes are copied verbatim instead of re-running a zlib encode
+    if src_suffix == ".png":
+        shutil.copyfile(source_image, src_path)
+    else:
+        cv2.imwrite(str(src_path), img_bgr, png_params)
     # Save processed template with regions removed
-    cv2.imwrite(str(template_path), template_img)
-    cv2.imwrite(str(reference_path), reference_img)
+    cv2.imwrite(str(template_path), template_img, png_params)
+
+    # The template is on disk now, so the reference can draw straight
+    # into the same buffer instead of copying a full page image
+    reference_img = _make_reference_image(
+        template_img,
+        regions,
+        placeholder_color=placeholder_color,
+        label_font_path=label_font_path,
+        inplace=True,
+    )
+    cv2.imwrite(str(reference_path), reference_img, png_params)
 
     # Check if regions file exists and preserve names if not replacing
     if not replace and regions_path.exists():
         try:
             # Load existing regions file
             with regions_path.open("r", encoding="utf-8") as f:
-                existing_data = yaml.safe_load(f)
+                existing_data = yaml.load(f, Loader=_SafeLoader)
             
             if existing_data and isinstance(existing_data, dict):
                 existing_regions = existing_data.get("regions", [])
                 
-                # Validate that regions match (same count and positions)
+                # Validate that regions match (same count and positions):
+                # compare the sorted bounding boxes as two arrays in one
+                # shot instead of building a dict just to probe it
                 if len(existing_regions) == len(regions):
-                    # Create a map of (x, y, width, height) -> (name, role) from existing regions
-                    existing_map = {}
-                    for er in existing_regions:
-                        key = (er.get("x"), er.get("y"), er.get("width"), er.get("height"))
-                        existing_map[key] = (er.get("name", ""), er.get("role", ""))
-                    
-                    # Check if all new regions match existing positions
-                    all_match = True
-                    text_map = {r.id: r.text for r in regions}
-                    for r in regions:
-                        key = (r.x, r.y, r.width, r.height)
-                        if key not in existing_map:
-                            all_match = False
-                            break
-                    
-                    if all_match:
+                    new_keys = np.array(
+                        sorted((r.x, r.y, r.width, r.height) for r in regions), dtype=np.int64
+                    )
+                    old_keys = np.array(
+                        sorted(
+                            (er.get("x"), er.get("y"), er.get("width"), er.get("height"))
+                            for er in existing_regions
+                        ),
+                        dtype=np.int64,
+                    )
+                    if np.array_equal(new_keys, old_keys):
                         # Preserve roles from existing file; use OCR text for names
+                        existing_map = {
+                            (er.get("x"), er.get("y"), er.get("width"), er.get("height")): er.get("role", "")
+                            for er in existing_regions
+                        }
                         for r in regions:
-                            key = (r.x, r.y, r.width, r.height)
-                            if key in existing_map:
-                                _, existing_role = existing_map[key]
-                                if existing_role:
-                                    role_map[r.id] = existing_role
+                            existing_role = existing_map.get((r.x, r.y, r.width, r.height))
+                            if existing_role:
+                                role_map[r.id] = existing_role
                         
                         print(f"Preserved region roles from existing {regions_name}")
                     else:
@@ -208,8 +259,24 @@ def analyze_template(
         ],
     }
 
-    with regions_path.open("w", encoding="utf-8") as f:
-        yaml.safe_dump(data, f, sort_keys=False)
+    if emit_format == "json":
+        # Machine-to-machine sidecar: JSON skips YAML encoding entirely.
+        # orjson when installed, stdlib json otherwise.
+        regions_path = regions_path.with_suffix(".json")
+        try:
+            import orjson
+
+            regions_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        except ImportError:
+            import json
+
+            regions_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    else:
+        with regions_path.open("w", encoding="utf-8") as f:
+            if os.environ.get("FLYTE_CANONICAL_YAML"):
+                yaml.dump(data, f, Dumper=_SafeDumper, sort_keys=False)
+            else:
+                f.write(_dump_regions_yaml(data))
 
     # Create index.html for the template directory
     _create_template_index_html(project_dir, base)
@@ -222,6 +289,42 @@ def analyze_template(
     }
 
 
+def _yaml_str(s: str) -> str:
+    """Quote a scalar for the minimal regions.yaml writer."""
+    return '"' + str(s).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+
+
+def _dump_regions_yaml(data: dict[str, Any]) -> str:
+    """Emit regions.yaml directly for the fixed schema analyze_template builds.
+
+    yaml.safe_dump is pure Python and dominates the write stage on
+    many-region templates; this schema is tiny and known, so a plain
+    string build suffices. Set FLYTE_CANONICAL_YAML to use yaml.safe_dump
+    instead.
+    """
+    parts = [
+        f"content_color: {_yaml_str(data['content_color'])}\n",
+        f"width: {data['width']}\n",
+        f"height: {data['height']}\n",
+        "css: []\n",
+        "regions:\n",
+    ]
+    for r in data["regions"]:
+        parts.append(f"- id: {r['id']}\n")
+        parts.append(f"  name: {_yaml_str(r['name'])}\n")
+        parts.append(f"  role: {_yaml_str(r['role'])}\n")
+        parts.append(f"  x: {r['x']}\n")
+        parts.append(f"  y: {r['y']}\n")
+        parts.append(f"  width: {r['width']}\n")
+        parts.append(f"  height: {r['height']}\n")
+        parts.append(f"  background_color: {_yaml_str(r['background_color'])}\n")
+        if "font" in r:
+            parts.append(f"  font: {_yaml_str(r['font'])}\n")
+            parts.append(f"  font_size: {r['font_size']}\n")
+    return "".join(parts)
+
+
+@lru_cache(maxsize=256)
 def hex_to_bgr(hex_color: str) -> tuple[int, int, int]:
     s = hex_color.strip().lstrip("#")
     if len(s) != 6:
@@ -239,13 +342,18 @@ def bgr_to_hex(bgr: tuple[int, int, int]) -> str:
 
 def _color_mask(img_bgr: np.ndarray, placeholder_bgr: tuple[int, int, int], *, tolerance: int) -> np.ndarray:
     b, g, r = placeholder_bgr
-    lower = np.array([max(0, b - tolerance), max(0, g - tolerance), max(0, r - tolerance)], dtype=np.uint8)
-    upper = np.array([min(255, b + tolerance), min(255, g + tolerance), min(255, r + tolerance)], dtype=np.uint8)
+    # OpenCV accepts plain scalars for the bounds; building ndarrays per
+    # call just allocated two tiny arrays for nothing
+    lower = (max(0, b - tolerance), max(0, g - tolerance), max(0, r - tolerance))
+    upper = (min(255, b + tolerance), min(255, g + tolerance), min(255, r + tolerance))
     return cv2.inRange(img_bgr, lower, upper)
 
 
 def _find_contours(mask: np.ndarray) -> list[np.ndarray]:
-    contours, _hier = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    # TC89 approximation emits fewer vertices on rectangular placeholders
+    # than CHAIN_APPROX_SIMPLE, which shrinks Region.contour and speeds
+    # the drawContours rasterization downstream
+    contours, _hier = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_TC89_KCOS)
     return list(contours)
 
 
@@ -255,22 +363,56 @@ def _build_regions(
     *,
     background_sample_offset: int,
 ) -> list[Region]:
-    raw: list[tuple[int, int, int, int, np.ndarray]] = []
-    for c in contours:
-        x, y, w, h = cv2.boundingRect(c)
-        raw.append((x, y, w, h, c))
+    # Bounding rects straight off the (N,1,2) contour arrays: a NumPy
+    # min/max pair per contour instead of a cv2.boundingRect call,
+    # which matters once templates have dozens of regions
+    rects = np.empty((len(contours), 4), dtype=np.int32)
+    for i, c in enumerate(contours):
+        pts = c.reshape(-1, 2)
+        rects[i, :2] = pts.min(axis=0)
+        rects[i, 2:] = pts.max(axis=0) - rects[i, :2] + 1
+
+    # Reading order (top-to-bottom, then left-to-right), sorted in C
+    # instead of a Python key function per element
+    order = np.lexsort((rects[:, 0], rects[:, 1]))
+
+    # Quantize the whole page to packed keys once; each region's
+    # background detection then just bincounts slice views instead of
+    # re-quantizing and concatenating its own strips. Buckets round to
+    # the nearest multiple of 8 (matching the old _quantize_rgb), which
+    # needs 33 values and hence 6 bits per channel.
+    packed = (
+        ((img_bgr[:, :, 0].astype(np.uint32) + 4) >> 3)
+        | (((img_bgr[:, :, 1].astype(np.uint32) + 4) >> 3) << 6)
+        | (((img_bgr[:, :, 2].astype(np.uint32) + 4) >> 3) << 12)
+    )
 
-    raw.sort(key=lambda t: (t[1], t[0]))
-    regions: list[Region] = []
-    for i, (x, y, w, h, contour) in enumerate(raw, start=1):
-        bg_hex = _detect_background_color(
-            img_bgr,
+    def _bg(idx: int) -> str:
+        x, y, w, h = (int(v) for v in rects[idx])
+        return _detect_background_color(
+            packed,
             x=x,
             y=y,
             w=w,
             h=h,
             offset=background_sample_offset,
         )
+
+    # Background sampling is read-only NumPy/OpenCV work that releases
+    # the GIL, so contour-dense templates map it across threads
+    if len(order) >= 4:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(len(order), os.cpu_count() or 1)) as ex:
+            bg_hexes = list(ex.map(_bg, order))
+    else:
+        bg_hexes = [_bg(idx) for idx in order]
+
+    regions: list[Region] = []
+    for i, idx in enumerate(order, start=1):
+        x, y, w, h = (int(v) for v in rects[idx])
+        contour = contours[idx]
+        bg_hex = bg_hexes[i - 1]
         regions.append(
             Region(
                 id=i,
@@ -285,42 +427,164 @@ def _build_regions(
     return regions
 
 
-def _extract_text_from_regions(img_bgr: np.ndarray, regions: list[Region]) -> list[Region]:
-    """Extract text from placeholder regions using OCR."""
-    updated_regions = []
-    
-    for region in regions:
-        # Extract the region from the image
-        roi = img_bgr[region.y:region.y + region.height, region.x:region.x + region.width]
-        
-        # Convert BGR to RGB for PIL
-        roi_rgb = cv2.cvtColor(roi, cv2.COLOR_BGR2RGB)
-        pil_image = Image.fromarray(roi_rgb)
-        
-        # Use pytesseract to extract text
+_EXECUTOR = None
+
+
+def _get_executor():
+    """Process pool shared across analyze_template calls.
+
+    Batch imports invoke the analyzer once per image; spinning workers
+    up and down each time wasted their interpreter start-up, so one
+    pool lives for the process and is shut down at exit.
+    """
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        import atexit
+        from concurrent.futures import ProcessPoolExecutor
+
+        _EXECUTOR = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 1) // 4))
+        atexit.register(_EXECUTOR.shutdown)
+    return _EXECUTOR
+
+
+def _ocr_one(job: tuple[bytes, tuple[int, int, int]]) -> str:
+    """Pool worker: OCR one region ROI. Module-level so it pickles."""
+    roi_bytes, shape = job
+    roi = np.frombuffer(roi_bytes, dtype=np.uint8).reshape(shape)
+    try:
+        text = pytesseract.image_to_string(
+            Image.fromarray(cv2.cvtColor(roi, cv2.COLOR_BGR2RGB)), config='--psm 6'
+        ).strip()
+        return ' '.join(text.split())
+    except Exception:
+        return ""
+
+
+def _ocr_batch(rois: list[np.ndarray]) -> list[str] | None:
+    """OCR all ROIs in one tesseract invocation via its file-list input.
+
+    Tesseract spends a large share of a short call on startup; a list
+    file amortizes that across every region, and the per-page results
+    come back on stdout separated by form feeds. Returns None when
+    tesseract is unavailable or the page count does not line up, so the
+    caller can fall back.
+    """
+    import subprocess
+    import tempfile
+
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            paths: list[str] = []
+            for i, roi in enumerate(rois):
+                roi_path = tmp / f"roi_{i}.png"
+                cv2.imwrite(str(roi_path), roi)
+                paths.append(str(roi_path))
+            list_file = tmp / "list.txt"
+            list_file.write_text("\n".join(paths) + "\n", encoding="utf-8")
+            proc = subprocess.run(
+                ["tesseract", str(list_file), "stdout", "--psm", "6"],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+    except Exception:
+        return None
+
+    pages = proc.stdout.split("\x0c")
+    if pages and not pages[-1].strip():
+        pages.pop()
+    if len(pages) != len(rois):
+        return None
+    return [' '.join(page.split()) for page in pages]
+
+
+def _ocr_region_texts(
+    img_bgr: np.ndarray,
+    regions: list[Region],
+    *,
+    ocr_dpi: int = 300,
+    source_dpi: int | None = None,
+) -> list[str]:
+    """OCR each region's ROI, in region order.
+
+    Each region is an independent Tesseract subprocess and OCR dominates
+    analyze_template wall time, so multi-region flyers fan out across a
+    process pool. Tesseract is internally threaded; one worker per four
+    cores avoids oversubscription. Only the raw ROI pixels are pickled.
+
+    source_dpi is the raster density of img_bgr when known (600 for PDF
+    pages); image sources of unknown density are passed through as-is.
+    """
+    rois = [img_bgr[r.y:r.y + r.height, r.x:r.x + r.width] for r in regions]
+
+    # Tesseract peaks around 300 DPI: when the source density is known
+    # to be higher (the 600 DPI PDF render), feeding it 4x the pixels
+    # just quadruples OCR time. Downscale every ROI once, up front, so
+    # all three OCR paths benefit.
+    scale = ocr_dpi / source_dpi if source_dpi else 1.0
+    if scale < 1.0:
+        rois = [
+            cv2.resize(roi, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            for roi in rois
+        ]
+
+    # One tesseract process for all regions beats anything per-region
+    if len(rois) >= 2:
+        batch = _ocr_batch(rois)
+        if batch is not None:
+            return batch
+
+    if len(rois) >= 2:
+        jobs = [(np.ascontiguousarray(roi).tobytes(), roi.shape) for roi in rois]
+        try:
+            return list(_get_executor().map(_ocr_one, jobs))
+        except Exception as e:
+            print(f"Warning: parallel OCR failed ({e}); falling back to sequential")
+
+    texts: list[str] = []
+    for region, roi in zip(regions, rois):
         try:
-            text = pytesseract.image_to_string(pil_image, config='--psm 6').strip()
+            text = pytesseract.image_to_string(
+                Image.fromarray(cv2.cvtColor(roi, cv2.COLOR_BGR2RGB)), config='--psm 6'
+            ).strip()
             # Clean up the text - remove extra whitespace and newlines
             text = ' '.join(text.split())
         except Exception as e:
             print(f"Warning: OCR failed for region {region.id}: {e}")
             text = ""
-        
-        # Create new Region with extracted text
-        updated_regions.append(
-            Region(
-                id=region.id,
-                x=region.x,
-                y=region.y,
-                width=region.width,
-                height=region.height,
-                background_color=region.background_color,
-                contour=region.contour,
-                text=text,
-            )
+        texts.append(text)
+    return texts
+
+
+def _ocr_skippable(r: Region) -> bool:
+    """True when a region is too small or too square to hold prose.
+
+    Square-ish placeholders are QR codes or icons; Tesseract would pay
+    its full startup cost to report nothing.
+    """
+    area = r.width * r.height
+    aspect = r.width / max(1.0, float(r.height))
+    return area < 2500 or (0.85 <= aspect <= 1.15 and area < 200 * 200)
+
+
+def _extract_text_from_regions(
+    img_bgr: np.ndarray,
+    regions: list[Region],
+    *,
+    ocr_dpi: int = 300,
+    source_dpi: int | None = None,
+) -> list[Region]:
+    """Extract text from placeholder regions using OCR."""
+    texts = [""] * len(regions)
+    todo = [i for i, r in enumerate(regions) if not _ocr_skippable(r)]
+    if todo:
+        found = _ocr_region_texts(
+            img_bgr, [regions[i] for i in todo], ocr_dpi=ocr_dpi, source_dpi=source_dpi
         )
-    
-    return updated_regions
+        for i, text in zip(todo, found):
+            texts[i] = text
+    return [replace(region, text=text) for region, text in zip(regions, texts)]
 
 
 def _guess_region_names(regions: list[Region]) -> dict[int, str]:
@@ -346,10 +610,11 @@ def _guess_region_names(regions: list[Region]) -> dict[int, str]:
     remaining = [r for r in regions if names[r.id] == ""]
     wide_short = [r for r in remaining if aspect(r) >= 2.0]
     url_region: Region | None = None
+    wide_short_ids = {r.id for r in wide_short}
     if wide_short:
         # Prefer the last in order; if qr exists and is last, prefer the one before it
-        if qr_region is not None and qr_region in wide_short:
-            idx = wide_short.index(qr_region)
+        if qr_region is not None and qr_region.id in wide_short_ids:
+            idx = next(i for i, r in enumerate(wide_short) if r.id == qr_region.id)
             if idx > 0:
                 url_region = wide_short[idx - 1]
         if url_region is None:
@@ -370,7 +635,10 @@ def _guess_region_names(regions: list[Region]) -> dict[int, str]:
         if len(bucket) < 3:
             bucket = []
     if len(bucket) >= 3:
-        bucket_sorted = [r for r in regions if r in bucket]
+        # Membership by id: Region equality falls through to comparing the
+        # contour arrays, so keep the lookups on plain ints
+        bucket_ids = {r.id for r in bucket}
+        bucket_sorted = [r for r in regions if r.id in bucket_ids]
         for name, reg in zip(["time", "date", "place"], bucket_sorted[:3]):
             names[reg.id] = name
 
@@ -386,7 +654,7 @@ def _guess_region_names(regions: list[Region]) -> dict[int, str]:
 
 
 def _detect_background_color(
-    img_bgr: np.ndarray,
+    packed: np.ndarray,
     *,
     x: int,
     y: int,
@@ -395,7 +663,8 @@ def _detect_background_color(
     offset: int,
     strip_width: int = 2,
 ) -> str:
-    height, width, _ = img_bgr.shape
+    """Modal color beside a region, from the pre-packed key image."""
+    height, width = packed.shape
 
     y0 = int(round(y + h * 0.2))
     y1 = int(round(y + h * 0.8))
@@ -410,44 +679,42 @@ def _detect_background_color(
     if left_x >= 0:
         x0 = max(0, left_x - strip_width)
         x1 = min(width, left_x + 1)
-        samples.append(img_bgr[y0:y1, x0:x1, :])
+        samples.append(packed[y0:y1, x0:x1])
 
     right_x = x + w + offset
     if right_x < width:
         x0 = max(0, right_x)
         x1 = min(width, right_x + strip_width + 1)
-        samples.append(img_bgr[y0:y1, x0:x1, :])
+        samples.append(packed[y0:y1, x0:x1])
 
     if not samples:
         top_y = y - offset
         if top_y >= 0:
             y0t = max(0, top_y - strip_width)
             y1t = min(height, top_y + 1)
-            samples.append(img_bgr[y0t:y1t, x : x + w, :])
+            samples.append(packed[y0t:y1t, x : x + w])
         bottom_y = y + h + offset
         if bottom_y < height:
             y0b = max(0, bottom_y)
             y1b = min(height, bottom_y + strip_width + 1)
-            samples.append(img_bgr[y0b:y1b, x : x + w, :])
+            samples.append(packed[y0b:y1b, x : x + w])
 
+    samples = [sub for sub in samples if sub.size > 0]
     if not samples:
         return "#000000"
 
-    pixels = np.concatenate([s.reshape(-1, 3) for s in samples if s.size > 0], axis=0)
-    if pixels.size == 0:
-        return "#000000"
-
-    q = _quantize_rgb(pixels, step=8)
-    colors, counts = np.unique(q, axis=0, return_counts=True)
-    mode = colors[int(np.argmax(counts))]
-    return bgr_to_hex((int(mode[0]), int(mode[1]), int(mode[2])))
-
-
-def _quantize_rgb(pixels_bgr: np.ndarray, *, step: int) -> np.ndarray:
-    step = max(1, int(step))
-    half = step // 2
-    q = ((pixels_bgr.astype(np.int16) + half) // step) * step
-    return np.clip(q, 0, 255).astype(np.uint8)
+    # Sum per-strip bincounts; 18-bit keys keep this at 262144 buckets
+    counts = np.bincount(samples[0].ravel(), minlength=1 << 18)
+    for sub in samples[1:]:
+        counts += np.bincount(sub.ravel(), minlength=1 << 18)
+    k = int(counts.argmax())
+    # Nearest-multiple-of-8 representative, clipped so the top bucket
+    # maps back to 255 (pure white stays #ffffff)
+    return bgr_to_hex((
+        min((k & 63) << 3, 255),
+        min(((k >> 6) & 63) << 3, 255),
+        min(((k >> 12) & 63) << 3, 255),
+    ))
 
 
 def _make_template_image(
@@ -458,14 +725,18 @@ def _make_template_image(
 ) -> np.ndarray:
     out = img_bgr.copy()
     k = max(1, int(edge_dilation))
-    kernel = np.ones((k, k), np.uint8)
 
+    # Group contours by fill color so each distinct color is painted with
+    # one fillPoly + one polylines call instead of two draw calls per
+    # region. A centered stroke of thickness k reaches k/2 beyond the
+    # edge, matching the reach of the old k-by-k dilation kernel.
+    by_color: dict[str, list[np.ndarray]] = {}
     for r in regions:
-        region_mask = np.zeros(out.shape[:2], dtype=np.uint8)
-        cv2.drawContours(region_mask, [r.contour], contourIdx=-1, color=255, thickness=-1)
-        dilated = cv2.dilate(region_mask, kernel, iterations=1)
-        bgr = hex_to_bgr(r.background_color)
-        out[dilated > 0] = bgr
+        by_color.setdefault(r.background_color, []).append(r.contour.reshape(-1, 2))
+    for color, polys in by_color.items():
+        bgr = hex_to_bgr(color)
+        cv2.fillPoly(out, polys, bgr)
+        cv2.polylines(out, polys, isClosed=True, color=bgr, thickness=k)
 
     return out
 
@@ -476,93 +747,104 @@ def _make_reference_image(
     *,
     placeholder_color: str,
     label_font_path: str | None = None,
+    inplace: bool = False,
 ) -> np.ndarray:
-    out = template_bgr.copy()
+    # inplace=True scribbles over template_bgr instead of allocating a
+    # full-page copy; only pass it when the template buffer is done with
+    out = template_bgr if inplace else template_bgr.copy()
     placeholder_bgr = hex_to_bgr(placeholder_color)
 
+    # Axis-aligned 2px borders are four slice assignments per region;
+    # no need to cross into cv2.rectangle for each one
     for r in regions:
-        cv2.rectangle(
-            out,
-            (r.x, r.y),
-            (r.x + r.width - 1, r.y + r.height - 1),
-            placeholder_bgr,
-            2,
-        )
-
-    rgb = cv2.cvtColor(out, cv2.COLOR_BGR2RGB)
-    img = Image.fromarray(rgb)
+        x0, y0 = r.x, r.y
+        x1, y1 = r.x + r.width, r.y + r.height
+        out[y0:y0 + 2, x0:x1] = placeholder_bgr
+        out[max(y0, y1 - 2):y1, x0:x1] = placeholder_bgr
+        out[y0:y1, x0:x0 + 2] = placeholder_bgr
+        out[y0:y1, max(x0, x1 - 2):x1] = placeholder_bgr
+
+    # Hand the BGR buffer to PIL as-is: the only PIL drawing is black
+    # text with a white stroke, and both are channel-symmetric, so the
+    # BGR2RGB/RGB2BGR roundtrip (two full-page passes) is pure waste
+    img = Image.fromarray(out)
     draw = ImageDraw.Draw(img)
 
     # Use provided font or find a suitable system font
     font_path = label_font_path or _find_font_path()
+
+    def _font_with_size(sz: int) -> ImageFont.ImageFont:
+        return _load_label_font(font_path, sz)
+
     for r in regions:
         # Create label with both ID and name
         if r.text:
             label = f"{r.id}: {r.text}"
         else:
             label = str(r.id)
-        
-        def _font_with_size(sz: int) -> ImageFont.ImageFont:
-            if font_path:
-                try:
-                    return ImageFont.truetype(font_path, size=sz)
-                except Exception:
-                    pass
-            return ImageFont.load_default()
-
-        # Binary search to find the largest font that fits both width and height constraints
+
+        # Find the largest font that fits both width and height constraints
         # with proper margins for readability
         margin_factor = 0.85  # Use 85% of available space
         target_w = int(r.width * margin_factor)
         target_h = int(r.height * margin_factor)
-        
-        # Start with a reasonable range based on region size
+
+        # Keep the font size within a reasonable range for the region
         min_dimension = min(r.width, r.height)
         lo = max(12, min_dimension // 20)  # Minimum font size
         hi = max(lo + 10, min_dimension * 2)  # Maximum font size to try
-        
-        best = _font_with_size(lo)
-        best_bbox = draw.textbbox((0, 0), label, font=best)
-        
-        while lo <= hi:
-            mid = (lo + hi) // 2
-            candidate = _font_with_size(mid)
-            bb = draw.textbbox((0, 0), label, font=candidate)
-            tw = bb[2] - bb[0]
-            th = bb[3] - bb[1]
-            
-            # Check if text fits within BOTH width and height constraints
-            if tw <= target_w and th <= target_h:
-                best = candidate
-                best_bbox = bb
-                lo = mid + 1  # Try larger
-            else:
-                hi = mid - 1  # Too big, try smaller
-        
-        f = best
-        bbox = best_bbox
-    
+
+        # Glyph metrics scale linearly with point size, so measure the
+        # label once at a reference size and solve for the fitting size
+        # directly — two textbbox calls per region instead of a ~10-probe
+        # binary search.
+        ref_size = 100
+        bb = draw.textbbox((0, 0), label, font=_font_with_size(ref_size))
+        tw_ref = max(1, bb[2] - bb[0])
+        th_ref = max(1, bb[3] - bb[1])
+        size = int(ref_size * min(target_w / tw_ref, target_h / th_ref))
+        f = _font_with_size(max(lo, min(hi, size)))
+
         bbox = draw.textbbox((0, 0), label, font=f)
         tw = bbox[2] - bbox[0]
         th = bbox[3] - bbox[1]
         tx = r.x + (r.width - tw) / 2
         ty = r.y + (r.height - th) / 2
 
-        # Thicker white outline for readability at larger sizes
+        # Thicker white outline for readability at larger sizes; Pillow
+        # strokes natively in one call, vs the (2*outline+1)^2 offset
+        # redraws this used to do
         outline = max(4, min(18, (tw + th) // 90))
-        for dx in range(-outline, outline + 1):
-            for dy in range(-outline, outline + 1):
-                if dx == 0 and dy == 0:
-                    continue
-                draw.text((tx + dx, ty + dy), label, font=f, fill=(255, 255, 255))
-        # Solid black fill on top
-        draw.text((tx, ty), label, font=f, fill=(0, 0, 0))
+        draw.text((tx, ty), label, font=f, fill=(0, 0, 0), stroke_width=outline, stroke_fill=(255, 255, 255))
 
-    out_rgb = np.array(img)
-    return cv2.cvtColor(out_rgb, cv2.COLOR_RGB2BGR)
+    return np.asarray(img)
 
 
+@lru_cache(maxsize=512)
+def _load_label_font(font_path: str | None, size: int) -> ImageFont.ImageFont:
+    """Load a label font once per (path, size) for the whole process.
+
+    ImageFont.truetype parses the font file on every call, and batch
+    imports probe the same sizes image after image.
+    """
+    if font_path:
+        try:
+            return ImageFont.truetype(font_path, size=size)
+        except Exception:
+            pass
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=1)
 def _find_font_path() -> str | None:
+    """Locate a label font, probing once per process.
+
+    FLYTE_FONT overrides the built-in candidates; the filesystem answer
+    cannot change at runtime, so the stat probes are cached.
+    """
+    env_font = os.environ.get("FLYTE_FONT")
+    if env_font and os.path.isfile(env_font):
+        return env_font
     candidates = (
         "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
         "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
@@ -570,9 +852,8 @@ def _find_font_path() -> str | None:
         "/Library/Fonts/Arial.ttf",
     )
     for name in candidates:
-        p = Path(name)
-        if p.exists():
-            return str(p)
+        if os.path.isfile(name):
+            return name
     return None
 
 
@@ -593,6 +874,10 @@ def _extract_pdf_region_fonts(pdf_path: Path, regions: list[Region], *, scale: f
     """Extract dominant font and average size for each region from a PDF.
     Uses PyMuPDF rawdict to get per-span bounding boxes and font info.
     Returns mapping: region_id -> (font_name, font_size_points).
+
+    The span/region geometry is done as one NumPy broadcast instead of
+    Python loops: text-dense PDFs carry thousands of spans, and per-span
+    per-region intersection checks dominated this stage.
     """
     if fitz is None:
         return {}
@@ -607,19 +892,19 @@ def _extract_pdf_region_fonts(pdf_path: Path, regions: list[Region], *, scale: f
         # Current regions are based on 600 DPI pixels (top-left origin), so convert back to points and add a margin.
         px_to_pt = 72.0 / 600.0
         margin_px = 8
-        reg_rects = {
-            r.id: (
-                (r.x - margin_px) * px_to_pt,
-                (r.y - margin_px) * px_to_pt,
-                (r.x + r.width + margin_px) * px_to_pt,
-                (r.y + r.height + margin_px) * px_to_pt,
-            )
-            for r in regions
-        }
+        reg_ids = [r.id for r in regions]
+        rx0 = np.array([(r.x - margin_px) * px_to_pt for r in regions], dtype=np.float64)
+        ry0 = np.array([(r.y - margin_px) * px_to_pt for r in regions], dtype=np.float64)
+        rx1 = np.array([(r.x + r.width + margin_px) * px_to_pt for r in regions], dtype=np.float64)
+        ry1 = np.array([(r.y + r.height + margin_px) * px_to_pt for r in regions], dtype=np.float64)
         # Page height in points is needed if spans use bottom-left origin
         page_height_pt = float(page.rect.height)
-        counts: dict[int, dict[tuple[str, float], int]] = {r.id: {} for r in regions}
-        all_spans: list[tuple[float, float, float, float, str, float, int]] = []
+
+        # Collect spans; walking the rawdict stays Python-level but does
+        # nothing except append — all geometry happens vectorized below
+        boxes: list[tuple[float, float, float, float]] = []
+        span_keys: list[tuple[str, float]] = []
+        char_counts: list[int] = []
         for block in text.get("blocks", []) or []:
             for line in block.get("lines", []) or []:
                 for span in line.get("spans", []) or []:
@@ -633,76 +918,86 @@ def _extract_pdf_region_fonts(pdf_path: Path, regions: list[Region], *, scale: f
                         x0, y0, x1, y1 = bbox
                     else:
                         x0, y0, x1, y1 = bbox.x0, bbox.y0, bbox.x1, bbox.y1
-                    # Normalize to top-left origin: flip Y using page height
-                    sy0_top = page_height_pt - y1
-                    sy1_top = page_height_pt - y0
-                    sx0, sy0, sx1, sy1 = x0, sy0_top, x1, sy1_top
                     chars = span.get("text") or ""
-                    char_count = len(chars)
-                    if char_count == 0:
+                    if not chars:
                         continue
-                    # Save for fallback proximity vote
-                    all_spans.append((sx0, sy0, sx1, sy1, font, size, char_count))
-                    # Primary: intersection-based counting
-                    for rid, (rx0, ry0, rx1, ry1) in reg_rects.items():
-                        if sx1 <= rx0 or sx0 >= rx1 or sy1 <= ry0 or sy0 >= ry1:
-                            continue
-                        key = (font, size)
-                        d = counts[rid]
-                        d[key] = d.get(key, 0) + char_count
+                    # Normalize to top-left origin: flip Y using page height
+                    boxes.append((x0, page_height_pt - y1, x1, page_height_pt - y0))
+                    span_keys.append((font, size))
+                    char_counts.append(len(chars))
+
+        if not boxes:
+            return {}
+
+        sb = np.asarray(boxes, dtype=np.float64)
+        sx0, sy0, sx1, sy1 = sb[:, 0], sb[:, 1], sb[:, 2], sb[:, 3]
+        cc = np.asarray(char_counts, dtype=np.float64)
+        sizes = np.asarray([sz for _f, sz in span_keys], dtype=np.float64)
+
+        # Integer codes for (font, size) pairs and bare fonts, so dominant
+        # choices reduce to weighted bincount + argmax
+        key_code_map: dict[tuple[str, float], int] = {}
+        font_code_map: dict[str, int] = {}
+        key_codes = np.empty(len(span_keys), dtype=np.intp)
+        font_codes = np.empty(len(span_keys), dtype=np.intp)
+        for i, key in enumerate(span_keys):
+            key_codes[i] = key_code_map.setdefault(key, len(key_code_map))
+            font_codes[i] = font_code_map.setdefault(key[0], len(font_code_map))
+        keys_by_code = list(key_code_map)
+        fonts_by_code = list(font_code_map)
+
+        # Primary: one (K, S) broadcast intersection test for all pairs
+        hits_matrix = (
+            (sx1[None, :] > rx0[:, None])
+            & (sx0[None, :] < rx1[:, None])
+            & (sy1[None, :] > ry0[:, None])
+            & (sy0[None, :] < ry1[:, None])
+        )
+
         result: dict[int, tuple[str, float]] = {}
-        for rid, font_map in counts.items():
-            if not font_map:
-                # Proximity-based fallback when no direct spans intersect the region
-                rx0, ry0, rx1, ry1 = reg_rects[rid]
-                rcx = (rx0 + rx1) * 0.5
-                rcy = (ry0 + ry1) * 0.5
-                page_diag = (page.rect.width ** 2 + page.rect.height ** 2) ** 0.5
-                radius = max(36.0, page_diag * 0.10)
-                font_weights: dict[str, float] = {}
-                size_accum: dict[str, tuple[float, float]] = {}
-                for sx0, sy0, sx1, sy1, fnt, sz, cc in all_spans:
-                    scx = (sx0 + sx1) * 0.5
-                    scy = (sy0 + sy1) * 0.5
-                    dx = scx - rcx
-                    dy = scy - rcy
-                    dist = (dx * dx + dy * dy) ** 0.5
-                    if dist > radius:
-                        continue
-                    weight = cc / (1.0 + dist)
-                    font_weights[fnt] = font_weights.get(fnt, 0.0) + weight
-                    if sz > 0:
-                        ws, ww = size_accum.get(fnt, (0.0, 0.0))
-                        size_accum[fnt] = (ws + sz * weight, ww + weight)
-                if font_weights:
-                    top_font = max(font_weights.items(), key=lambda kv: kv[1])[0]
-                    ws, ww = size_accum.get(top_font, (0.0, 0.0))
-                    size = ws / ww if ww > 0 else 0.0
-                    result[rid] = (normalize_font_name(top_font), size)
-                    continue
-                else:
+        missing: list[int] = []
+        for k, rid in enumerate(reg_ids):
+            hits = hits_matrix[k]
+            if hits.any():
+                weights = np.bincount(key_codes[hits], weights=cc[hits], minlength=len(keys_by_code))
+                font, size = keys_by_code[int(weights.argmax())]
+                result[rid] = (normalize_font_name(font), size)
+            else:
+                missing.append(k)
+
+        # Proximity-based fallback when no direct spans intersect a region
+        if missing:
+            scx = (sx0 + sx1) * 0.5
+            scy = (sy0 + sy1) * 0.5
+            page_diag = (page.rect.width ** 2 + page.rect.height ** 2) ** 0.5
+            radius = max(36.0, page_diag * 0.10)
+            for k in missing:
+                rcx = (rx0[k] + rx1[k]) * 0.5
+                rcy = (ry0[k] + ry1[k]) * 0.5
+                dist = np.hypot(scx - rcx, scy - rcy)
+                near = dist <= radius
+                if not near.any():
                     # No nearby spans found either; leave empty and move on
                     continue
-            # Pick dominant font by char count
-            (font, size), total = max(font_map.items(), key=lambda kv: kv[1])
-            result[rid] = (normalize_font_name(font), size)
+                w = np.where(near, cc / (1.0 + dist), 0.0)
+                font_weights = np.bincount(font_codes, weights=w, minlength=len(fonts_by_code))
+                top_code = int(font_weights.argmax())
+                sel = near & (font_codes == top_code) & (sizes > 0)
+                ww = w[sel].sum()
+                size = float((sizes[sel] * w[sel]).sum() / ww) if ww > 0 else 0.0
+                result[reg_ids[k]] = (normalize_font_name(fonts_by_code[top_code]), size)
+
         # If still missing, assign the page-dominant font as a final fallback
-        if len(result) < len(regions) and all_spans:
-            from collections import defaultdict
-            page_font_counts: dict[str, int] = defaultdict(int)
-            page_font_sizes: dict[str, tuple[float, int]] = defaultdict(lambda: (0.0, 0))
-            for sx0, sy0, sx1, sy1, fnt, sz, cc in all_spans:
-                page_font_counts[fnt] += cc
-                if sz > 0:
-                    ssum, scount = page_font_sizes[fnt]
-                    page_font_sizes[fnt] = (ssum + sz * cc, scount + cc)
-            if page_font_counts:
-                top_font = max(page_font_counts.items(), key=lambda kv: kv[1])[0]
-                ssum, scount = page_font_sizes.get(top_font, (0.0, 0))
-                page_avg_size = (ssum / scount) if scount > 0 else 0.0
-                for r in regions:
-                    if r.id not in result:
-                        result[r.id] = (normalize_font_name(top_font), page_avg_size)
+        if len(result) < len(regions):
+            font_weights = np.bincount(font_codes, weights=cc, minlength=len(fonts_by_code))
+            top_code = int(font_weights.argmax())
+            top_font = fonts_by_code[top_code]
+            sel = (font_codes == top_code) & (sizes > 0)
+            csum = cc[sel].sum()
+            page_avg_size = float((sizes[sel] * cc[sel]).sum() / csum) if csum > 0 else 0.0
+            for r in regions:
+                if r.id not in result:
+                    result[r.id] = (normalize_font_name(top_font), page_avg_size)
         return result
     finally:
         doc.close()
@@ -716,15 +1011,14 @@ def _extract_embedded_fonts(pdf_path: Path) -> list[str]:
     doc = fitz.open(str(pdf_path))
     names: list[str] = []
     try:
-        import re
         for xref in range(1, doc.xref_length()):
             try:
                 obj = doc.xref_object(xref) or ""
             except Exception:
                 continue
-            if "/Type /FontDescriptor" not in obj:
+            if _FONTDESC_MARKER not in obj:
                 continue
-            m = re.search(r"/FontName\s*/(?:[A-Z]+\+)?([^\s/\]]+)", obj)
+            m = _FONTNAME_RE.search(obj)
             if m:
                 names.append(normalize_font_name(m.group(1)))
     finally:
@@ -2,25 +2,41 @@
 
 from __future__ import annotations
 
+import shutil
 import tempfile
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Annotated
 
 import httpx
 from fastapi import FastAPI, Form, HTTPException, Query, Request
 from fastapi.responses import FileResponse, HTMLResponse
+from starlette.background import BackgroundTask
 
 from flyte.render import render_html_to_file
 
-app = FastAPI(title="Flyte Web Renderer", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One shared client for the life of the app: keep-alive pooling means
+    # repeat renders of the same host skip the TCP/TLS handshake
+    app.state.http = httpx.AsyncClient(
+        follow_redirects=True,
+        timeout=30,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    )
+    yield
+    await app.state.http.aclose()
+
+
+app = FastAPI(title="Flyte Web Renderer", version="1.0.0", lifespan=lifespan)
 
 
 async def fetch_html_from_url(url: str) -> str:
-    """Fetch HTML content from a URL using httpx."""
-    async with httpx.AsyncClient(follow_redirects=True) as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        return response.text
+    """Fetch HTML content from a URL using the shared httpx client."""
+    response = await app.state.http.get(url)
+    response.raise_for_status()
+    return response.text
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -184,32 +200,37 @@ async def _render_url(url: str, format: str):
     try:
         # Fetch HTML content from URL
         html_content = await fetch_html_from_url(url)
-        
-        # Create temporary files
-        with tempfile.TemporaryDirectory() as tmpdir:
+
+        # Create temporary files; the directory outlives this function so
+        # the rendered file can be streamed straight from disk, and is
+        # cleaned up by a background task once the response is sent
+        tmpdir = tempfile.mkdtemp()
+        try:
             tmp_path = Path(tmpdir)
             html_file = tmp_path / "page.html"
             html_file.write_text(html_content, encoding='utf-8')
-            
+
             # Render to requested format
             output_file = tmp_path / f"output.{format}"
             render_html_to_file(html_file, output_file)
-            
-            # Read the file into memory before temp directory is deleted
-            file_bytes = output_file.read_bytes()
-            
-        # Return the rendered file from memory
+        except BaseException:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+            raise
+
+        # Stream the rendered file instead of buffering it in memory
         media_type = "image/png" if format == "png" else "application/pdf"
         filename = f"render.{format}"
-        
-        from fastapi.responses import Response
-        return Response(
-            content=file_bytes,
+
+        return FileResponse(
+            output_file,
             media_type=media_type,
             headers={
                 "Content-Disposition": f"{'inline' if format == 'png' else 'attachment'}; filename={filename}"
-            }
+            },
+            background=BackgroundTask(shutil.rmtree, tmpdir, ignore_errors=True),
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Rendering failed: {str(e)}")
 
@@ -1,25 +1,25 @@
 from __future__ import annotations
 
+import numpy as np
 import yaml
 from pathlib import Path
 
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
 EXAMPLES_DIR = Path('test/examples')
 
 # Define 4 categories by area thresholds (in sq pixels)
 # You can tune these thresholds as needed
-CATEGORIES = [
-    ("xs", 0, 50_000),
-    ("sm", 50_000, 150_000),
-    ("md", 150_000, 300_000),
-    ("lg", 300_000, float('inf')),
-]
+CATEGORY_NAMES = np.array(["xs", "sm", "md", "lg"])
+CATEGORY_BINS = np.array([50_000, 150_000, 300_000])
 
 
-def classify(area: int) -> str:
-    for name, lo, hi in CATEGORIES:
-        if lo <= area < hi:
-            return name
-    return "lg"
+def classify_all(areas: np.ndarray) -> np.ndarray:
+    """Classify all region areas at once instead of scanning per region."""
+    return CATEGORY_NAMES[np.digitize(areas, CATEGORY_BINS)]
 
 
 def main() -> None:
@@ -32,17 +32,17 @@ def main() -> None:
 
     for fp in files:
         with fp.open('r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
+            data = yaml.load(f, Loader=_SafeLoader)
         regions = data.get('regions') or []
         if not isinstance(regions, list):
             continue
         summary.append(f"\nFile: {fp}")
-        for r in regions:
+        areas = np.array(
+            [int(r.get('width', 0)) * int(r.get('height', 0)) for r in regions], dtype=np.int64
+        )
+        cats = classify_all(areas)
+        for r, area, cat in zip(regions, areas, cats):
             name = (r.get('name') or str(r.get('id')) or '').strip()
-            w = int(r.get('width', 0))
-            h = int(r.get('height', 0))
-            area = w * h
-            cat = classify(area)
             summary.append(f" - {name:20s} area={area:7d} px^2  category={cat}")
 
     print("\n".join(summary))
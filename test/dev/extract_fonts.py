@@ -12,6 +12,11 @@ import sys
 import os
 import re
 
+# Compiled once: the xref scan runs these against every object string
+FONTNAME_RE = re.compile(r'/FontName\s*/([A-Z]+\+)?([^\s/\]]+)')
+# One combined pattern captures whichever FontFile variant appears first
+FF_RE = re.compile(r'/FontFile[23]?\s+(\d+)\s+\d+\s+R')
+
 
 def extract_fonts(pdf_path, output_dir=None):
     """Extract all embedded fonts from a PDF."""
@@ -29,19 +34,18 @@ def extract_fonts(pdf_path, output_dir=None):
     for i in range(1, doc.xref_length()):
         try:
             obj = doc.xref_object(i)
-            if "/Type /FontDescriptor" in obj:
-                # Extract font name (strip subset prefix like AAAAAA+)
-                match = re.search(r'/FontName\s*/([A-Z]+\+)?([^\s/\]]+)', obj)
-                if match:
-                    name = match.group(2)
-                    
-                    # Find the FontFile reference (FontFile, FontFile2, or FontFile3)
-                    for key in ["FontFile2", "FontFile3", "FontFile"]:
-                        ff_match = re.search(rf'/{key}\s+(\d+)\s+\d+\s+R', obj)
-                        if ff_match:
-                            stream_xref = int(ff_match.group(1))
-                            font_names[stream_xref] = name
-                            break
+            if "/FontDescriptor" not in obj:
+                continue
+            # Extract font name (strip subset prefix like AAAAAA+)
+            match = FONTNAME_RE.search(obj)
+            if match:
+                name = match.group(2)
+
+                # Find the FontFile reference (FontFile, FontFile2, or FontFile3)
+                ff_match = FF_RE.search(obj)
+                if ff_match:
+                    stream_xref = int(ff_match.group(1))
+                    font_names[stream_xref] = name
         except:
             pass
     
@@ -5,6 +5,10 @@ from typing import Iterable, List, Dict, Any
 
 try:
     import yaml  # type: ignore
+    try:
+        from yaml import CSafeDumper as _SafeDumper, CSafeLoader as _SafeLoader
+    except ImportError:
+        from yaml import SafeDumper as _SafeDumper, SafeLoader as _SafeLoader
 except Exception as e:  # pragma: no cover
     yaml = None
 
@@ -14,7 +18,7 @@ def load_yaml_fonts(source_path: Path) -> List[str]:
         raise RuntimeError("PyYAML is required to read/write YAML. Please install pyyaml.")
     data: Any
     with source_path.open("r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+        data = yaml.load(f, Loader=_SafeLoader)
     # Accept either {'fonts': [...]} or a plain list [...]
     if isinstance(data, dict) and "fonts" in data and isinstance(data["fonts"], list):
         fonts = [str(x) for x in data["fonts"]]
@@ -63,15 +67,19 @@ def split_fonts(
     else:
         norm = lambda s: s
 
-    main_norm = [norm(m) for m in main_list]
+    if mode not in ("exact", "prefix"):
+        raise ValueError("mode must be 'exact' or 'prefix'")
+
+    # Hash lookups instead of an O(M) list scan per font
+    main_set = {norm(m) for m in main_list}
 
     def is_main(font: str) -> bool:
         f = norm(font)
         if mode == "exact":
-            return f in main_norm
-        if mode == "prefix":
-            return any(f.startswith(m) for m in main_norm)
-        raise ValueError("mode must be 'exact' or 'prefix'")
+            return f in main_set
+        # prefix: a match must be one of f's own prefixes, so probe those
+        # against the set — O(len(f)) lookups regardless of list size
+        return any(f[:k] in main_set for k in range(1, len(f) + 1))
 
     main: List[str] = []
     other: List[str] = []
@@ -84,7 +92,7 @@ def write_grouped_yaml(output_path: Path, grouped: Dict[str, List[str]]) -> None
     if yaml is None:
         raise RuntimeError("PyYAML is required to read/write YAML. Please install pyyaml.")
     with output_path.open("w", encoding="utf-8") as f:
-        yaml.safe_dump(grouped, f, sort_keys=False, allow_unicode=True)
+        yaml.dump(grouped, f, Dumper=_SafeDumper, sort_keys=False, allow_unicode=True)
 
 
 def parse_args() -> argparse.Namespace:
@@ -10,19 +10,15 @@ except Exception:
 
 
 def strip_suffix(name: str) -> str:
-    # Remove substring after the first '-' to get the family name
-    parts = name.split("-", 1)
-    return parts[0].strip()
+    # Remove substring after the first '-' to get the family name;
+    # find+slice avoids the list allocation of split()
+    i = name.find("-")
+    return (name if i < 0 else name[:i]).strip()
 
 
 def dedupe_preserve_order(items: List[str]) -> List[str]:
-    seen = set()
-    out: List[str] = []
-    for it in items:
-        if it not in seen:
-            seen.add(it)
-            out.append(it)
-    return out
+    # Dicts preserve insertion order, so fromkeys dedupes in one C pass
+    return list(dict.fromkeys(items))
 
 
 def normalize_lists(obj: Dict[str, Any], keys: List[str]) -> Dict[str, Any]: